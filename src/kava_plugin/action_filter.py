@@ -0,0 +1,73 @@
+import dataclasses
+from typing import FrozenSet, Optional
+
+# normalized actions of each family. the fee journal of a transaction is its own
+# family because every transaction can pay one
+ACTION_FAMILIES = {
+    "staking": frozenset({"delegate", "begin_unbonding"}),
+    "cdp": frozenset(
+        {
+            "create_cdp",
+            "draw_cdp",
+            "repay_cdp",
+            "deposit_cdp",
+            "withdraw_cdp",
+            "claim_usdx_minting_reward",
+        }
+    ),
+    "hard": frozenset(
+        {
+            "hard_deposit",
+            "hard_withdraw",
+            "hard_borrow",
+            "hard_repay",
+            "claim_hard_reward",
+        }
+    ),
+    "swap": frozenset(
+        {"swap_exact_for_tokens", "swap_deposit", "swap_withdraw", "claim_swap_reward"}
+    ),
+    "transfers": frozenset({"send"}),
+    "atomic_swaps": frozenset({"create_atomic_swap", "claim_atomic_swap"}),
+    "fees": frozenset(),
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class ActionFilter:
+    families: FrozenSet[str]
+    actions: FrozenSet[str] = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        if len(self.families) == 0:
+            raise ValueError(
+                f"at least one action family is required. families: {', '.join(ACTION_FAMILIES)}"
+            )
+        unknown_families = sorted(set(self.families) - set(ACTION_FAMILIES))
+        if len(unknown_families) > 0:
+            raise ValueError(
+                f"unknown action families: {', '.join(unknown_families)}. families: {', '.join(ACTION_FAMILIES)}"
+            )
+        object.__setattr__(self, "families", frozenset(self.families))
+        object.__setattr__(
+            self,
+            "actions",
+            frozenset().union(*(ACTION_FAMILIES[family] for family in self.families)),
+        )
+
+    def includes(self, action: Optional[str]) -> bool:
+        return action in self.actions
+
+    def includes_fees(self) -> bool:
+        return "fees" in self.families
+
+    def includes_messages(self) -> bool:
+        return len(self.actions) > 0
+
+    def __str__(self) -> str:
+        return ",".join(family for family in ACTION_FAMILIES if family in self.families)
+
+    @classmethod
+    def parse(cls, spec: str) -> "ActionFilter":
+        families = [family.strip() for family in spec.split(",")]
+        return ActionFilter(frozenset(family for family in families if family))
@@ -0,0 +1,153 @@
+import dataclasses
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.kava_util import DECIMAL_CONTEXT
+
+WALLET = "wallet"
+# module accounts of the journals and the account they hold for the address
+ACCOUNTS = {
+    "kava_validator": "staking",
+    "kava_cdp": "cdp",
+    "hard_lending": "hard",
+    "kava_swap": "pool",
+}
+# counterparties that are not addresses
+COUNTERPARTIES = {*ACCOUNTS, "kava_staking_reward", "kava_bc_atomic_swap", "fee"}
+# signs of a journal amount for the wallet and the module account. borrowed
+# tokens leave the module account negative until they are repaid
+TYPES = {
+    "deposit": (-1, 1),
+    "repay": (-1, 1),
+    "withdraw": (1, -1),
+    "borrow": (1, -1),
+    "get": (1, 0),
+    "receive": (1, 0),
+    "lose": (-1, 0),
+    "send": (-1, 0),
+    "get_bonds": (0, 1),
+    "lose_bonds": (0, -1),
+}
+SNAPSHOT_PERIODS = {"transaction", "day"}
+
+BalanceKey = Tuple[str, Optional[str], str]
+
+
+@dataclasses.dataclass(frozen=True)
+class BalanceSnapshot:
+    executed_at: str
+    transaction_id: str
+    address: str
+    uti: Optional[str]
+    account: str
+    balance: str
+
+
+SNAPSHOT_FIELD_NAMES = [field.name for field in dataclasses.fields(BalanceSnapshot)]
+
+
+class BalanceTracker:
+    def __init__(
+        self,
+        on_snapshot: Callable[[BalanceSnapshot], None],
+        period: str = "transaction",
+    ):
+        if period not in SNAPSHOT_PERIODS:
+            raise ValueError(
+                f"unknown snapshot period: {period}. periods: {', '.join(sorted(SNAPSHOT_PERIODS))}"
+            )
+        self.on_snapshot = on_snapshot
+        self.period = period
+        self.balances: Dict[BalanceKey, Decimal] = {}
+        self._period_key: Optional[str] = None
+        self._last: Optional[CaajJournal] = None
+        self._changed: Dict[BalanceKey, None] = {}
+
+    def track(self, caajs: Iterable[CaajJournal]) -> Iterator[CaajJournal]:
+        for caaj in caajs:
+            self.add(caaj)
+            yield caaj
+        self.flush()
+
+    def add(self, caaj: CaajJournal) -> None:
+        last = self._last
+        if last is not None and (str(caaj.executed_at), caaj.transaction_id) < (
+            str(last.executed_at),
+            last.transaction_id,
+        ):
+            raise ValueError(
+                f"journals must be sorted by executed_at and transaction_id. transaction_id: {caaj.transaction_id} follows {last.transaction_id}"
+            )
+        period_key = (
+            caaj.transaction_id
+            if self.period == "transaction"
+            else str(caaj.executed_at)[:10]
+        )
+        if period_key != self._period_key:
+            self.flush()
+            self._period_key = period_key
+        self._last = caaj
+
+        if caaj.type not in TYPES:
+            raise ValueError(
+                f"unknown journal type: {caaj.type}. transaction_id: {caaj.transaction_id}"
+            )
+        wallet_sign, account_sign = TYPES[caaj.type]
+        address = BalanceTracker.get_address(caaj)
+        amount = Decimal(caaj.amount)
+        if wallet_sign != 0:
+            self._move((address, caaj.uti, WALLET), wallet_sign, amount)
+        if account_sign != 0:
+            account = ACCOUNTS.get(caaj.caaj_to) or ACCOUNTS.get(caaj.caaj_from)
+            if account is None:
+                raise ValueError(
+                    f"journal has no module account. type: {caaj.type} transaction_id: {caaj.transaction_id}"
+                )
+            self._move((address, caaj.uti, account), account_sign, amount)
+
+    def flush(self) -> None:
+        last = self._last
+        if last is None:
+            return
+        executed_at = (
+            str(last.executed_at)
+            if self.period == "transaction"
+            else str(last.executed_at)[:10]
+        )
+        for key in self._changed:
+            address, uti, account = key
+            self.on_snapshot(
+                BalanceSnapshot(
+                    executed_at,
+                    last.transaction_id,
+                    address,
+                    uti,
+                    account,
+                    str(self.balances[key]),
+                )
+            )
+        self._changed = {}
+
+    def get_balance(
+        self, address: str, uti: Optional[str], account: str = WALLET
+    ) -> Decimal:
+        return self.balances.get((address, uti, account), Decimal(0))
+
+    @classmethod
+    def get_address(cls, caaj: CaajJournal) -> str:
+        if caaj.type == "send":
+            return caaj.caaj_from
+        if caaj.type == "receive":
+            return caaj.caaj_to
+        return caaj.caaj_to if caaj.caaj_from in COUNTERPARTIES else caaj.caaj_from
+
+    def _move(self, key: BalanceKey, sign: int, amount: Decimal) -> None:
+        balance = self.balances.get(key, Decimal(0))
+        self.balances[key] = (
+            DECIMAL_CONTEXT.add(balance, amount)
+            if sign > 0
+            else DECIMAL_CONTEXT.subtract(balance, amount)
+        )
+        self._changed[key] = None
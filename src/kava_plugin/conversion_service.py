@@ -0,0 +1,251 @@
+import dataclasses
+import json
+import logging
+import os
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Union
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.action_filter import ActionFilter
+from kava_plugin.dead_letter import DeadLetterFile
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.kava_util import KavaUtil
+from kava_plugin.message_cache import MessageCache
+from kava_plugin.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from senkalib.token_original_id_table import TokenOriginalIdTable
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+MAX_REQUEST_SIZE = 256 * 1024**2
+
+
+class ConversionRequestError(Exception):
+    pass
+
+
+class UnixThreadingHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class ConversionService:
+    def __init__(
+        self,
+        token_table: "TokenOriginalIdTable",
+        get_transactions: Optional[Callable[[str], Iterable[KavaTransaction]]] = None,
+        message_cache: Optional[MessageCache] = None,
+        workers: Optional[int] = None,
+    ):
+        self.token_table = token_table
+        self.get_transactions = get_transactions
+        self.message_cache = (
+            message_cache if message_cache is not None else MessageCache()
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="kava_plugin_service"
+        )
+
+    def convert(self, request: dict) -> dict:
+        addresses = request.get("addresses")
+        if (
+            not isinstance(addresses, list)
+            or len(addresses) == 0
+            or not all(isinstance(address, str) for address in addresses)
+        ):
+            raise ConversionRequestError(
+                "addresses must be a non empty list of strings"
+            )
+        addresses = list(dict.fromkeys(addresses))
+
+        payloads = request.get("transactions")
+        if payloads is None:
+            transactions = self._fetch_transactions(addresses)
+            # only transactions fetched by the service are shared between requests
+            message_cache = self.message_cache
+        elif isinstance(payloads, list):
+            for payload in payloads:
+                ConversionService._check_payload(payload)
+            transactions = [
+                KavaTransaction(KavaUtil.intern_strings(payload))
+                for payload in payloads
+            ]
+            message_cache = None
+        else:
+            raise ConversionRequestError("transactions must be a list of payloads")
+
+        actions = request.get("actions")
+        if actions is None:
+            action_filter = None
+        elif isinstance(actions, list) and all(
+            isinstance(action, str) for action in actions
+        ):
+            action_filter = ActionFilter(frozenset(actions))
+        else:
+            raise ConversionRequestError("actions must be a list of action families")
+        tolerant = request.get("dead_letters", False)
+        if not isinstance(tolerant, bool):
+            raise ConversionRequestError("dead_letters must be a boolean")
+
+        caajs = []
+        dead_letters = []
+        for transaction in transactions:
+            if not KavaPlugin.can_handle(transaction):
+                continue
+            try:
+                if len(addresses) == 1:
+                    caaj_peaces = [
+                        KavaPlugin.get_caajs(
+                            addresses[0],
+                            transaction,
+                            self.token_table,
+                            message_cache,
+                            action_filter,
+                        )
+                    ]
+                else:
+                    caaj_peaces = KavaPlugin.get_caajs_for_addresses(
+                        addresses,
+                        transaction,
+                        self.token_table,
+                        message_cache,
+                        action_filter,
+                    ).values()
+            except Exception as e:
+                if not tolerant:
+                    if payloads is not None:
+                        # a payload of the request that can not be converted
+                        raise ConversionRequestError(
+                            f"can not convert transaction {transaction.get_transaction_id()}. {type(e).__name__}: {e}"
+                        ) from e
+                    raise e
+                record = DeadLetterFile.get_record(transaction, e)
+                del record["transaction"]
+                dead_letters.append(record)
+                continue
+            for caaj_peace in caaj_peaces:
+                caajs.extend(dataclasses.asdict(caaj) for caaj in caaj_peace)
+
+        caajs.sort(key=lambda caaj: caaj["executed_at"])
+        return {"caajs": caajs, "dead_letters": dead_letters}
+
+    def get_status(self) -> dict:
+        return {"status": "ok", "message_cache": self.message_cache.get_stats()}
+
+    def get_server(
+        self,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+        socket_path: Optional[str] = None,
+    ) -> Union[ThreadingHTTPServer, UnixThreadingHTTPServer]:
+        service = self
+
+        class ConversionHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = REGISTRY.render().encode()
+                    self._send(200, body, "text/plain; version=0.0.4")
+                elif self.path == "/status":
+                    self._send_json(200, service.get_status())
+                else:
+                    self._send_json(404, {"error": f"unknown path: {self.path}"})
+
+            def do_POST(self):
+                if self.path != "/caajs":
+                    self._send_json(404, {"error": f"unknown path: {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    if length > MAX_REQUEST_SIZE:
+                        raise ConversionRequestError(
+                            f"request is too large. size: {length}"
+                        )
+                    request = json.loads(self.rfile.read(length) or b"null")
+                    if not isinstance(request, dict):
+                        raise ConversionRequestError("request must be a json object")
+                    response = service.convert(request)
+                except (ConversionRequestError, ValueError) as e:
+                    self._send_json(400, {"error": f"{type(e).__name__}: {e}"})
+                except Exception as e:
+                    logger.exception("conversion failed")
+                    self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+                else:
+                    self._send_json(200, response)
+
+            def address_string(self):
+                # unix socket clients have no address
+                return str(self.client_address[0]) if self.client_address else "local"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, value: dict) -> None:
+                self._send(status, json.dumps(value).encode(), "application/json")
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            return UnixThreadingHTTPServer(socket_path, ConversionHandler)
+        return ThreadingHTTPServer((host, port or 0), ConversionHandler)
+
+    def serve(
+        self,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+        socket_path: Optional[str] = None,
+    ) -> Union[ThreadingHTTPServer, UnixThreadingHTTPServer]:
+        server = self.get_server(port, host, socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+    @classmethod
+    def _check_payload(cls, payload) -> None:
+        header = payload.get("header") if isinstance(payload, dict) else None
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if (
+            not isinstance(header, dict)
+            or not isinstance(header.get("chain_id"), str)
+            or not isinstance(data, dict)
+            or not isinstance(data.get("txhash"), str)
+        ):
+            raise ConversionRequestError(
+                "transactions must be payloads with header.chain_id and data.txhash"
+            )
+
+    def _fetch_transactions(self, addresses: list) -> list:
+        get_transactions = self.get_transactions
+        if get_transactions is None:
+            raise ConversionRequestError(
+                "transactions are required when the service can not fetch them"
+            )
+        transactions: dict = {}
+        # address histories are fetched from the kava api concurrently
+        for history in self.executor.map(
+            lambda address: list(get_transactions(address)), addresses
+        ):
+            for transaction in history:
+                transactions.setdefault(transaction.get_transaction_id(), transaction)
+        return list(transactions.values())
@@ -0,0 +1,63 @@
+import json
+import logging
+import traceback
+from typing import Iterator, Optional
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.transaction_reader import TransactionReader
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class DeadLetterFile:
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, transaction: KavaTransaction, error: Exception) -> None:
+        self.append(DeadLetterFile.get_record(transaction, error))
+
+    def append(self, record: dict) -> None:
+        logger.warning(
+            f"dead letter transaction_id: {record['transaction_id']} error: {record['error']}"
+        )
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "DeadLetterFile":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @classmethod
+    def get_record(cls, transaction: KavaTransaction, error: Exception) -> dict:
+        payload = transaction.get_transaction()
+        return {
+            "transaction_id": transaction.get_transaction_id(),
+            "chain_id": DeadLetterFile._get_chain_id(payload),
+            "error": f"{type(error).__name__}: {error}",
+            "traceback": "".join(
+                traceback.format_exception(type(error), error, error.__traceback__)
+            ),
+            "transaction": payload,
+        }
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[KavaTransaction]:
+        for record in TransactionReader.read_raw(path):
+            yield KavaTransaction(record["transaction"])
+
+    @classmethod
+    def _get_chain_id(cls, payload: dict) -> Optional[str]:
+        try:
+            return payload["header"]["chain_id"]
+        except (KeyError, TypeError):
+            return None
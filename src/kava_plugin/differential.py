@@ -0,0 +1,126 @@
+import dataclasses
+import itertools
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from senkalib.caaj_journal import CaajJournal
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.journal_sorter import FIELD_NAMES
+from kava_plugin.kava_plugin import KavaPlugin
+
+if TYPE_CHECKING:
+    from senkalib.token_original_id_table import TokenOriginalIdTable
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+# a converter takes an address, transactions and a token table and returns journals
+Converter = Callable[
+    [str, List[KavaTransaction], "TokenOriginalIdTable"], Iterable[CaajJournal]
+]
+
+
+@dataclasses.dataclass(frozen=True)
+class Divergence:
+    transaction_id: str
+    index: Optional[int]
+    field: Optional[str]
+    reference: object
+    candidate: object
+
+    def __str__(self) -> str:
+        if self.index is None:
+            return f"transaction {self.transaction_id}: {self.reference} reference journals, {self.candidate} candidate journals"
+        return f"transaction {self.transaction_id} journal {self.index} {self.field}: reference {self.reference!r}, candidate {self.candidate!r}"
+
+
+class DifferentialHarness:
+    @classmethod
+    def get_reference_caajs(
+        cls,
+        address: str,
+        transactions: List[KavaTransaction],
+        token_table: "TokenOriginalIdTable",
+    ) -> Iterable[CaajJournal]:
+        for transaction in transactions:
+            if KavaPlugin.can_handle(transaction):
+                yield from KavaPlugin.get_caajs(address, transaction, token_table)
+
+    @classmethod
+    def check(
+        cls,
+        address: str,
+        transactions: Iterable[KavaTransaction],
+        token_table: "TokenOriginalIdTable",
+        candidate: Converter,
+        reference: Optional[Converter] = None,
+    ) -> Optional[Divergence]:
+        transactions = list(transactions)
+        reference = reference or DifferentialHarness.get_reference_caajs
+        divergence = DifferentialHarness.compare(
+            reference(address, transactions, token_table),
+            candidate(address, transactions, token_table),
+            [transaction.get_transaction_id() for transaction in transactions],
+        )
+        if divergence is not None:
+            logger.error(f"converters diverge. {divergence}")
+        return divergence
+
+    @classmethod
+    def compare(
+        cls,
+        reference: Iterable[CaajJournal],
+        candidate: Iterable[CaajJournal],
+        transaction_ids: Optional[List[str]] = None,
+    ) -> Optional[Divergence]:
+        reference_journals = DifferentialHarness._group(reference)
+        candidate_journals = DifferentialHarness._group(candidate)
+        # transactions are compared in the input order when it is known
+        order = itertools.chain(
+            transaction_ids or [], reference_journals, candidate_journals
+        )
+        for transaction_id in dict.fromkeys(order):
+            divergence = DifferentialHarness._compare_transaction(
+                transaction_id,
+                reference_journals.get(transaction_id, []),
+                candidate_journals.get(transaction_id, []),
+            )
+            if divergence is not None:
+                return divergence
+        return None
+
+    @classmethod
+    def _compare_transaction(
+        cls, transaction_id: str, reference: list, candidate: list
+    ) -> Optional[Divergence]:
+        if len(reference) != len(candidate):
+            return Divergence(
+                transaction_id, None, None, len(reference), len(candidate)
+            )
+        DifferentialHarness._normalize_trade_uuids(reference)
+        DifferentialHarness._normalize_trade_uuids(candidate)
+        for index, (expected, actual) in enumerate(zip(reference, candidate)):
+            for name in FIELD_NAMES:
+                if expected[name] != actual[name]:
+                    return Divergence(
+                        transaction_id, index, name, expected[name], actual[name]
+                    )
+        return None
+
+    @classmethod
+    def _group(cls, caajs: Iterable[CaajJournal]) -> Dict[str, list]:
+        journals: Dict[str, list] = {}
+        for caaj in caajs:
+            row = dataclasses.asdict(caaj)
+            journals.setdefault(row["transaction_id"], []).append(row)
+        return journals
+
+    @classmethod
+    def _normalize_trade_uuids(cls, rows: list) -> None:
+        # trade uuids are random and are compared by their order of appearance
+        trade_uuids: Dict[str, str] = {}
+        for row in rows:
+            row["trade_uuid"] = trade_uuids.setdefault(
+                row["trade_uuid"], f"trade-{len(trade_uuids)}"
+            )
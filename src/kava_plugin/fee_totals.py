@@ -0,0 +1,22 @@
+from typing import Set
+
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.period_rollup import PeriodRollup
+
+
+class FeeTotals(PeriodRollup):
+    count_name = "transactions"
+    # only fee journals are summed, and they are all of type lose
+    required_fields = ()
+
+    def __init__(self, period: str = "month"):
+        super().__init__(period, ("uti",))
+        # every involved address gets a fee journal of the same transaction
+        self.transaction_ids: Set[str] = set()
+
+    def add(self, caaj: CaajJournal) -> None:
+        if caaj.caaj_to != "fee" or caaj.transaction_id in self.transaction_ids:
+            return
+        self.transaction_ids.add(caaj.transaction_id)
+        super().add(caaj)
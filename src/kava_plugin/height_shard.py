@@ -0,0 +1,75 @@
+import dataclasses
+from typing import Iterable, List, Optional, Tuple
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+# block heights restart on every chain upgrade, so a position in the history is
+# (chain version, height) rather than the height alone
+HeightKey = Tuple[int, int]
+
+
+@dataclasses.dataclass(frozen=True)
+class HeightShard:
+    start: Optional[HeightKey] = None
+    end: Optional[HeightKey] = None
+
+    def contains(self, transaction: KavaTransaction) -> bool:
+        key = HeightShard.get_key(transaction)
+        return (self.start is None or self.start <= key) and (
+            self.end is None or key < self.end
+        )
+
+    def __str__(self) -> str:
+        return f"{HeightShard._format_key(self.start)}..{HeightShard._format_key(self.end)}"
+
+    @classmethod
+    def get_key(cls, transaction: KavaTransaction) -> HeightKey:
+        height = transaction.get_transaction()["data"]["height"]
+        return transaction.get_platform_version(), int(height)
+
+    @classmethod
+    def parse(cls, spec: str) -> "HeightShard":
+        if ".." not in spec:
+            raise ValueError(
+                f"shard must be START..END such as kava-8:100..kava-9:200. shard: {spec}"
+            )
+        start, end = spec.split("..", 1)
+        return HeightShard(HeightShard._parse_key(start), HeightShard._parse_key(end))
+
+    @classmethod
+    def plan(
+        cls, transactions: Iterable[KavaTransaction], count: int
+    ) -> List["HeightShard"]:
+        if count <= 0:
+            raise ValueError(f"shard count must be positive. count: {count}")
+
+        keys = sorted(HeightShard.get_key(transaction) for transaction in transactions)
+        boundaries: List[HeightKey] = []
+        for i in range(1, count):
+            if len(keys) == 0:
+                break
+            boundary = keys[i * len(keys) // count]
+            # a height is never split across shards
+            if boundary != keys[0] and boundary not in boundaries:
+                boundaries.append(boundary)
+
+        starts: List[Optional[HeightKey]] = [None, *boundaries]
+        ends: List[Optional[HeightKey]] = [*boundaries, None]
+        return [HeightShard(start, end) for start, end in zip(starts, ends)]
+
+    @classmethod
+    def _parse_key(cls, value: str) -> Optional[HeightKey]:
+        value = value.strip()
+        if value == "":
+            return None
+        try:
+            chain_id, height = value.rsplit(":", 1)
+            return int(chain_id.rsplit("-", 1)[-1]), int(height)
+        except ValueError:
+            raise ValueError(
+                f"shard bound must be CHAIN_ID:HEIGHT such as kava-8:100. bound: {value}"
+            )
+
+    @classmethod
+    def _format_key(cls, key: Optional[HeightKey]) -> str:
+        return "" if key is None else f"kava-{key[0]}:{key[1]}"
@@ -0,0 +1,134 @@
+import csv
+import dataclasses
+import heapq
+import logging
+import operator
+import os
+import sys
+import tempfile
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Union
+
+from senkalib.caaj_journal import CaajJournal
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+FIELD_NAMES = [field.name for field in dataclasses.fields(CaajJournal)]
+
+
+class JournalSorter:
+    def __init__(
+        self,
+        max_memory: Optional[int] = None,
+        sort_key: Union[str, Sequence[str]] = "executed_at",
+        directory: Optional[str] = None,
+    ):
+        if max_memory is not None and max_memory <= 0:
+            raise ValueError(f"max_memory must be positive. max_memory: {max_memory}")
+        self.max_memory = max_memory
+        sort_keys = [sort_key] if isinstance(sort_key, str) else sort_key
+        self._get_sort_key = operator.itemgetter(
+            *(FIELD_NAMES.index(key) for key in sort_keys)
+        )
+        self.directory = directory
+        self.runs: List[str] = []
+        self._rows: list = []
+        self._size = 0
+        self._temporary_directory: Optional[tempfile.TemporaryDirectory] = None
+
+    def add(self, caaj: CaajJournal) -> None:
+        row = tuple(getattr(caaj, name) for name in FIELD_NAMES)
+        self._rows.append(row)
+        self._size += JournalSorter._get_row_size(row)
+        if self.max_memory is not None and self._size > self.max_memory:
+            self._spill()
+
+    def extend(self, caajs: Iterable[CaajJournal]) -> None:
+        for caaj in caajs:
+            self.add(caaj)
+
+    def get_rows(self) -> Iterator[tuple]:
+        self._rows.sort(key=self._get_sort_key)
+        if len(self.runs) == 0:
+            return iter(self._rows)
+
+        # runs are merged in the order they were written, so equal keys keep
+        # their insertion order just like a stable in-memory sort
+        readers = [JournalSorter._read_run(path) for path in self.runs]
+        readers.append(iter(self._rows))
+        return heapq.merge(*readers, key=self._get_sort_key)
+
+    def get_caajs(self) -> Iterator[CaajJournal]:
+        uti_index = FIELD_NAMES.index("uti")
+        for row in self.get_rows():
+            # a missing uti is written as an empty string in the spilled runs
+            if row[uti_index] == "":
+                row = (*row[:uti_index], None, *row[uti_index + 1 :])
+            yield CaajJournal(*row)
+
+    def write_csv(self, stream: IO[str]) -> None:
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(FIELD_NAMES)
+        writer.writerows(self.get_rows())
+
+    @classmethod
+    def merge_csv(
+        cls, paths: Iterable[str], stream: IO[str], sort_key: str = "executed_at"
+    ) -> None:
+        sort_index = FIELD_NAMES.index(sort_key)
+        files = [open(path, encoding="utf-8", newline="") for path in paths]
+        try:
+            readers = []
+            for file in files:
+                reader = csv.reader(file)
+                header = next(reader, None)
+                if header is None:
+                    continue
+                if header != FIELD_NAMES:
+                    raise ValueError(f"unexpected journal csv header: {file.name}")
+                readers.append(row for row in reader if len(row) > 0)
+
+            writer = csv.writer(stream, lineterminator="\n")
+            writer.writerow(FIELD_NAMES)
+            writer.writerows(heapq.merge(*readers, key=lambda row: row[sort_index]))
+        finally:
+            for file in files:
+                file.close()
+
+    def close(self) -> None:
+        self._rows = []
+        self._size = 0
+        self.runs = []
+        if self._temporary_directory is not None:
+            self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+    def __enter__(self) -> "JournalSorter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _spill(self) -> None:
+        if self._temporary_directory is None:
+            self._temporary_directory = tempfile.TemporaryDirectory(
+                prefix="kava_plugin_", dir=self.directory
+            )
+        path = os.path.join(self._temporary_directory.name, f"run_{len(self.runs)}")
+        self._rows.sort(key=self._get_sort_key)
+        with open(path, "w", encoding="utf-8", newline="") as run:
+            csv.writer(run, lineterminator="\n").writerows(self._rows)
+        logger.debug(f"spilled {len(self._rows)} journals to {path}")
+        self.runs.append(path)
+        self._rows = []
+        self._size = 0
+
+    @classmethod
+    def _read_run(cls, path: str) -> Iterator[tuple]:
+        with open(path, encoding="utf-8", newline="") as run:
+            for row in csv.reader(run):
+                yield tuple(row)
+
+    @classmethod
+    def _get_row_size(cls, row: tuple) -> int:
+        return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
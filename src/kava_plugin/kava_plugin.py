@@ -1,20 +1,46 @@
+import collections
+import itertools
+import time
 import uuid
+from concurrent.futures import Executor
 from decimal import Decimal
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Optional, Tuple
 
 from senkalib.caaj_journal import CaajJournal
 from senkalib.platform.kava.kava_transaction import KavaTransaction
-from senkalib.token_original_id_table import TokenOriginalIdTable
 
+from kava_plugin.action_filter import ActionFilter
+from kava_plugin.kava_util import DECIMAL_CONTEXT, KavaUtil
+from kava_plugin.message_cache import MessageCache
 from kava_plugin.message_factory import MessageFactory
+from kava_plugin.metrics import (
+    CONVERSION_SECONDS,
+    JOURNALS,
+    REGISTRY,
+    TRANSACTIONS,
+    UTI_MISSES,
+)
+from kava_plugin.uti_cache import UtiCache
+
+if TYPE_CHECKING:
+    from senkalib.token_original_id_table import TokenOriginalIdTable
 
 MEGA = 10**6
 EXA = 10**18
+DEFAULT_CHUNK_SIZE = 256
+MAX_PENDING_CHUNKS = 16
+
+
+class UnknownActionError(Exception):
+    pass
 
 
 class KavaPlugin:
     platform = "kava"
     application = "kava"
+    _builders: Optional[Dict[str, Callable[..., Iterator[CaajJournal]]]] = None
+    # uti cache of a worker process started with init_worker
+    _worker_uti_cache: Optional[UtiCache] = None
 
     @classmethod
     def can_handle(cls, transaction: KavaTransaction) -> bool:
@@ -26,362 +52,457 @@ class KavaPlugin:
         cls,
         address: str,
         transaction: KavaTransaction,
-        token_table: TokenOriginalIdTable,
+        token_table: "TokenOriginalIdTable",
+        message_cache: Optional[MessageCache] = None,
+        action_filter: Optional[ActionFilter] = None,
+    ) -> list:
+        return list(
+            KavaPlugin.iter_caajs(
+                address, transaction, token_table, message_cache, action_filter
+            )
+        )
+
+    @classmethod
+    def iter_caajs(
+        cls,
+        address: str,
+        transaction: KavaTransaction,
+        token_table: "TokenOriginalIdTable",
+        message_cache: Optional[MessageCache] = None,
+        action_filter: Optional[ActionFilter] = None,
+    ) -> Iterator[CaajJournal]:
+        start = time.perf_counter()
+        results = KavaPlugin._get_results(transaction, message_cache, action_filter)
+        journals = 0
+        # time spent by the consumer between journals is not conversion time
+        paused = 0.0
+        for caaj in KavaPlugin._get_caajs_from_results(
+            address, transaction, results, token_table, action_filter
+        ):
+            journals += 1
+            pause = time.perf_counter()
+            yield caaj
+            paused += time.perf_counter() - pause
+        KavaPlugin._observe(transaction, journals, start + paused)
+
+    @classmethod
+    def get_caajs_many(
+        cls,
+        address: str,
+        transactions: Iterable[KavaTransaction],
+        token_table: "TokenOriginalIdTable",
+        message_cache: Optional[MessageCache] = None,
+        executor: Optional[Executor] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_error: Optional[Callable[[KavaTransaction, Exception], None]] = None,
+        action_filter: Optional[ActionFilter] = None,
+        worker_processes: bool = False,
+    ) -> Iterator[CaajJournal]:
+        if worker_processes and executor is None:
+            raise ValueError("worker_processes requires an executor")
+        uti_cache = UtiCache(token_table)
+        transactions = filter(KavaPlugin.can_handle, transactions)
+        if executor is None:
+            for transaction in transactions:
+                if on_error is None:
+                    yield from KavaPlugin.iter_caajs(
+                        address, transaction, uti_cache, message_cache, action_filter
+                    )
+                    continue
+                # journals of a failing transaction are not emitted partially
+                try:
+                    caajs = KavaPlugin.get_caajs(
+                        address, transaction, uti_cache, message_cache, action_filter
+                    )
+                except Exception as e:
+                    on_error(transaction, e)
+                    continue
+                yield from caajs
+            return
+
+        # chunks are converted in the executor and yielded in their original order.
+        # message_cache can not be shared with worker processes and is not used.
+        # with worker_processes, the workers hold the token table since
+        # KavaPlugin.init_worker, so it is not pickled with every chunk
+        worker_uti_cache = None if worker_processes else uti_cache
+        pending: collections.deque = collections.deque()
+        iterator = iter(transactions)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if len(chunk) > 0:
+                future = executor.submit(
+                    KavaPlugin._get_caajs_chunk,
+                    address,
+                    chunk,
+                    worker_uti_cache,
+                    action_filter,
+                )
+                pending.append((chunk, future))
+            if len(pending) == 0:
+                return
+            if len(chunk) > 0 and len(pending) < MAX_PENDING_CHUNKS:
+                continue
+
+            chunk, future = pending.popleft()
+            results, metrics = future.result()
+            if metrics is not None:
+                REGISTRY.merge(metrics)
+            for transaction, caajs in zip(chunk, results):
+                if isinstance(caajs, Exception):
+                    if on_error is None:
+                        raise caajs
+                    on_error(transaction, caajs)
+                    continue
+                yield from caajs
+
+    @classmethod
+    def get_caajs_for_addresses(
+        cls,
+        addresses: Iterable[str],
+        transaction: KavaTransaction,
+        token_table: "TokenOriginalIdTable",
+        message_cache: Optional[MessageCache] = None,
+        action_filter: Optional[ActionFilter] = None,
+    ) -> Dict[str, list]:
+        start = time.perf_counter()
+        involved_addresses = KavaPlugin.get_involved_addresses(addresses, transaction)
+        if len(involved_addresses) == 0:
+            return {}
+
+        results = KavaPlugin._get_results(transaction, message_cache, action_filter)
+        caajs = {}
+        for address in involved_addresses:
+            caajs[address] = list(
+                KavaPlugin._get_caajs_from_results(
+                    address, transaction, results, token_table, action_filter
+                )
+            )
+        KavaPlugin._observe(
+            transaction, sum(len(caaj_peace) for caaj_peace in caajs.values()), start
+        )
+        return caajs
+
+    @classmethod
+    def get_involved_addresses(
+        cls, addresses: Iterable[str], transaction: KavaTransaction
+    ) -> list:
+        values = set(KavaUtil.get_string_values(transaction.get_transaction()["data"]))
+        return [address for address in dict.fromkeys(addresses) if address in values]
+
+    @classmethod
+    def init_worker(cls, token_table: "TokenOriginalIdTable") -> None:
+        # initializer of the worker processes of get_caajs_many, e.g.
+        # ProcessPoolExecutor(initializer=KavaPlugin.init_worker, initargs=(table,))
+        KavaPlugin._worker_uti_cache = UtiCache(token_table)
+
+    @classmethod
+    def _get_caajs_chunk(
+        cls,
+        address: str,
+        transactions: list,
+        token_table: Optional["TokenOriginalIdTable"],
+        action_filter: Optional[ActionFilter] = None,
+    ) -> Tuple[list, Optional[dict]]:
+        in_worker = token_table is None
+        if in_worker:
+            token_table = KavaPlugin._worker_uti_cache
+            if token_table is None:
+                raise RuntimeError(
+                    "worker processes must be started with KavaPlugin.init_worker"
+                )
+            # the metrics of the chunk are sent back to the parent with the journals
+            REGISTRY.reset()
+        results: list = []
+        for transaction in transactions:
+            try:
+                results.append(
+                    KavaPlugin.get_caajs(
+                        address, transaction, token_table, action_filter=action_filter
+                    )
+                )
+            except Exception as e:
+                results.append(e)
+        return results, REGISTRY.snapshot() if in_worker else None
+
+    @classmethod
+    def _get_results(
+        cls,
+        transaction: KavaTransaction,
+        message_cache: Optional[MessageCache] = None,
+        action_filter: Optional[ActionFilter] = None,
     ) -> list:
-        caajs = []
+        if message_cache is not None:
+            results = message_cache.get(transaction.get_transaction_id())
+            if results is not None:
+                return results
 
-        messages = (
-            MessageFactory.get_messages(transaction)
+        views = (
+            MessageFactory.get_message_views(transaction)
             if transaction.get_fail() is False
             else []
         )
-        trade_uuid = KavaPlugin._get_uuid()
-        for message in messages:
+        results = []
+        for view in views:
+            # messages outside the filter are skipped before they are parsed.
+            # unknown actions are not skipped and fail as without a filter
+            action = view.get_normalized_action()
+            if (
+                action_filter is not None
+                and action is not None
+                and not action_filter.includes(action)
+            ):
+                continue
             try:
-                result = message.get_result()
+                results.append(view.get_result())
             except Exception as e:
                 raise e
 
-            if result["action"] == "delegate":
-                caajs.extend(
-                    KavaPlugin.__get_delegate_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "begin_redelegate":
-                caajs.extend(
-                    KavaPlugin.__get_delegate_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "begin_unbonding":
-                caajs.extend(
-                    KavaPlugin.__get_begin_unbonding_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "create_cdp":
-                caajs.extend(
-                    KavaPlugin.__get_create_cdp_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "draw_cdp":
-                caajs.extend(
-                    KavaPlugin.__get_draw_cdp_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "repay_cdp":
-                caajs.extend(
-                    KavaPlugin.__get_repay_cdp_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "deposit_cdp":
-                caajs.extend(
-                    KavaPlugin.__get_deposit_cdp_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "withdraw_cdp":
-                caajs.extend(
-                    KavaPlugin.__get_withdraw_cdp_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "claim_usdx_minting_reward":
-                caajs.extend(
-                    KavaPlugin.__get_claim_usdx_minting_reward_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "hard_withdraw":
-                caajs.extend(
-                    KavaPlugin.__get_hard_withdraw_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "hard_deposit":
-                caajs.extend(
-                    KavaPlugin.__get_hard_deposit_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "hard_borrow":
-                caajs.extend(
-                    KavaPlugin.__get_hard_borrow_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "hard_repay":
-                caajs.extend(
-                    KavaPlugin.__get_hard_repay_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "claim_hard_reward":
-                caajs.extend(
-                    KavaPlugin.__get_claim_hard_reward_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "swap_exact_for_tokens":
-                caajs.extend(
-                    KavaPlugin.__get_swap_exact_for_tokens_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "swap_deposit":
-                caajs.extend(
-                    KavaPlugin.__get_swap_deposit_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "swap_withdraw":
-                caajs.extend(
-                    KavaPlugin.__get_swap_withdraw_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "claim_swap_reward":
-                caajs.extend(
-                    KavaPlugin.__get_claim_swap_reward_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "send":
-                caajs.extend(
-                    KavaPlugin.__get_send_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif (
-                result["action"] == "create_atomic_swap"
-                or result["action"] == "claim_atomic_swap"
-            ):
-                caajs.extend(
-                    KavaPlugin.__get_create_atomic_swap_caajs(
-                        transaction, result["result"], token_table, address, trade_uuid
-                    )
-                )
-            elif result["action"] == "vote":
-                pass
-            else:
-                raise Exception(
+        # filtered results are partial and are not shared through the cache
+        if message_cache is not None and action_filter is None:
+            message_cache.put(transaction.get_transaction_id(), results)
+        return results
+
+    @classmethod
+    def _get_caajs_from_results(
+        cls,
+        address: str,
+        transaction: KavaTransaction,
+        results: list,
+        token_table: "TokenOriginalIdTable",
+        action_filter: Optional[ActionFilter] = None,
+    ) -> Iterator[CaajJournal]:
+        builders = KavaPlugin._get_builders()
+        trade_uuid = KavaPlugin._get_uuid()
+        for result in results:
+            if result["action"] == "vote":
+                continue
+            builder = builders.get(result["action"])
+            if builder is None:
+                raise UnknownActionError(
                     f"This type of transaction is not defined. transaction_id: {transaction.get_transaction_id()}"
                 )
+            # cached results are complete and are filtered here
+            if action_filter is not None and not action_filter.includes(
+                result["action"]
+            ):
+                continue
+            yield from builder(
+                transaction, result["result"], token_table, address, trade_uuid
+            )
 
+        if action_filter is not None and not action_filter.includes_fees():
+            return
         transaction_fee = transaction.get_transaction_fee()
         if transaction_fee != 0:
-            caaj_fee = KavaPlugin._get_caaj_fee(
+            yield from KavaPlugin._get_caaj_fee(
                 address, transaction, token_table, trade_uuid
             )
-            caajs.extend(caaj_fee)
 
-        return caajs
+    @classmethod
+    def _get_builders(cls) -> Dict[str, Callable[..., Iterator[CaajJournal]]]:
+        # the private builders can only be referenced once the class is created
+        if KavaPlugin._builders is None:
+            KavaPlugin._builders = {
+                "delegate": KavaPlugin.__get_delegate_caajs,
+                "begin_redelegate": KavaPlugin.__get_delegate_caajs,
+                "begin_unbonding": KavaPlugin.__get_begin_unbonding_caajs,
+                "create_cdp": KavaPlugin.__get_create_cdp_caajs,
+                "draw_cdp": KavaPlugin.__get_draw_cdp_caajs,
+                "repay_cdp": KavaPlugin.__get_repay_cdp_caajs,
+                "deposit_cdp": KavaPlugin.__get_deposit_cdp_caajs,
+                "withdraw_cdp": KavaPlugin.__get_withdraw_cdp_caajs,
+                "claim_usdx_minting_reward": KavaPlugin.__get_claim_usdx_minting_reward_caajs,
+                "hard_withdraw": KavaPlugin.__get_hard_withdraw_caajs,
+                "hard_deposit": KavaPlugin.__get_hard_deposit_caajs,
+                "hard_borrow": KavaPlugin.__get_hard_borrow_caajs,
+                "hard_repay": KavaPlugin.__get_hard_repay_caajs,
+                "claim_hard_reward": KavaPlugin.__get_claim_hard_reward_caajs,
+                "swap_exact_for_tokens": KavaPlugin.__get_swap_exact_for_tokens_caajs,
+                "swap_deposit": KavaPlugin.__get_swap_deposit_caajs,
+                "swap_withdraw": KavaPlugin.__get_swap_withdraw_caajs,
+                "claim_swap_reward": KavaPlugin.__get_claim_swap_reward_caajs,
+                "send": KavaPlugin.__get_send_caajs,
+                "create_atomic_swap": KavaPlugin.__get_create_atomic_swap_caajs,
+                "claim_atomic_swap": KavaPlugin.__get_create_atomic_swap_caajs,
+            }
+        return KavaPlugin._builders
 
     @classmethod
     def __get_delegate_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
+    ) -> Iterator[CaajJournal]:
+        executed_at = transaction.get_timestamp()
+        transaction_id = transaction.get_transaction_id()
         if result["staking_amount"] is not None and Decimal(
             result["staking_amount"]
         ) != Decimal("0"):
             token_original_id = KavaPlugin._get_token_original_id(
                 result["staking_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
 
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "delegate",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "deposit",
-                    result["staking_amount"],
-                    uti,
-                    address,
-                    "kava_validator",
-                    f'staking {result["staking_amount"]} {token_original_id}',
-                )
+            yield CaajJournal(
+                executed_at,
+                cls.platform,
+                cls.application,
+                "delegate",
+                transaction_id,
+                trade_uuid,
+                "deposit",
+                result["staking_amount"],
+                uti,
+                address,
+                "kava_validator",
+                f'staking {result["staking_amount"]} {token_original_id}',
             )
         # try to find delegate reward
         for reward in result["rewards"]:
             token_original_id = KavaPlugin._get_token_original_id(
                 reward["reward_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "kava staking reward",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "get",
-                    reward["reward_amount"],
-                    uti,
-                    "kava_staking_reward",
-                    address,
-                    f'staking reward {reward["reward_amount"]} {reward["reward_token"]}',
-                )
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
+                executed_at,
+                cls.platform,
+                cls.application,
+                "kava staking reward",
+                transaction_id,
+                trade_uuid,
+                "get",
+                reward["reward_amount"],
+                uti,
+                "kava_staking_reward",
+                address,
+                f'staking reward {reward["reward_amount"]} {reward["reward_token"]}',
             )
-        return caajs
 
     @classmethod
     def __get_begin_unbonding_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
+    ) -> Iterator[CaajJournal]:
+        executed_at = transaction.get_timestamp()
+        transaction_id = transaction.get_transaction_id()
         if result["unbonding_amount"] is not None and Decimal(
             result["unbonding_amount"]
         ) != Decimal("0"):
             token_original_id = KavaPlugin._get_token_original_id(
                 result["unbonding_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
 
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "begin unbonding",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "withdraw",
-                    result["unbonding_amount"],
-                    uti,
-                    "kava_validator",
-                    address,
-                    f'unstaking {result["unbonding_amount"]} {result["unbonding_token"]}',
-                )
+            yield CaajJournal(
+                executed_at,
+                cls.platform,
+                cls.application,
+                "begin unbonding",
+                transaction_id,
+                trade_uuid,
+                "withdraw",
+                result["unbonding_amount"],
+                uti,
+                "kava_validator",
+                address,
+                f'unstaking {result["unbonding_amount"]} {result["unbonding_token"]}',
             )
         # try to find delegate reward
         for reward in result["rewards"]:
             token_original_id = KavaPlugin._get_token_original_id(
                 reward["reward_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "kava staking reward",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "get",
-                    reward["reward_amount"],
-                    uti,
-                    "kava_staking_reward",
-                    address,
-                    f'staking reward {reward["reward_amount"]} {reward["reward_token"]}',
-                )
-            )
-        return caajs
-
-    @classmethod
-    def __get_create_cdp_caajs(
-        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
-        token_original_id = KavaPlugin._get_token_original_id(result["deposit_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
+                executed_at,
                 cls.platform,
                 cls.application,
-                "cdp deposit",
-                transaction.get_transaction_id(),
+                "kava staking reward",
+                transaction_id,
                 trade_uuid,
-                "deposit",
-                result["deposit_amount"],
+                "get",
+                reward["reward_amount"],
                 uti,
+                "kava_staking_reward",
                 address,
-                "kava_cdp",
-                f'cdp deposit {result["deposit_amount"]} {token_original_id}',
+                f'staking reward {reward["reward_amount"]} {reward["reward_token"]}',
             )
+
+    @classmethod
+    def __get_create_cdp_caajs(
+        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
+    ) -> Iterator[CaajJournal]:
+        token_original_id = KavaPlugin._get_token_original_id(result["deposit_token"])
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp deposit",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "deposit",
+            result["deposit_amount"],
+            uti,
+            address,
+            "kava_cdp",
+            f'cdp deposit {result["deposit_amount"]} {token_original_id}',
         )
 
         token_original_id = KavaPlugin._get_token_original_id(result["draw_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "cdp borrow",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "borrow",
-                result["draw_amount"],
-                uti,
-                "kava_cdp",
-                address,
-                f'cdp draw {result["draw_amount"]} {token_original_id}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp borrow",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "borrow",
+            result["draw_amount"],
+            uti,
+            "kava_cdp",
+            address,
+            f'cdp draw {result["draw_amount"]} {token_original_id}',
         )
-        return caajs
 
     @classmethod
     def __get_draw_cdp_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(result["draw_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "cdp draw",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "borrow",
-                result["draw_amount"],
-                uti,
-                address,
-                "kava_cdp",
-                f'cdp repay {result["draw_amount"]} {result["draw_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp draw",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "borrow",
+            result["draw_amount"],
+            uti,
+            address,
+            "kava_cdp",
+            f'cdp repay {result["draw_amount"]} {result["draw_token"]}',
         )
 
-        return caajs
-
     @classmethod
     def __get_repay_cdp_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(result["repay_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "cdp repay",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "repay",
-                result["repay_amount"],
-                uti,
-                address,
-                "kava_cdp",
-                f'cdp repay {result["repay_amount"]} {result["repay_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp repay",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "repay",
+            result["repay_amount"],
+            uti,
+            address,
+            "kava_cdp",
+            f'cdp repay {result["repay_amount"]} {result["repay_token"]}',
         )
 
         if (
@@ -391,62 +512,8 @@ class KavaPlugin:
             token_original_id = KavaPlugin._get_token_original_id(
                 result["withdraw_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "cdp withdraw",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "withdraw",
-                    result["withdraw_amount"],
-                    uti,
-                    "kava_cdp",
-                    address,
-                    f'cdp withdraw {result["withdraw_amount"]} {result["withdraw_token"]}',
-                )
-            )
-        return caajs
-
-    @classmethod
-    def __get_deposit_cdp_caajs(
-        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
-        token_original_id = KavaPlugin._get_token_original_id(result["deposit_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "cdp deposit",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "deposit",
-                result["deposit_amount"],
-                uti,
-                address,
-                "kava_cdp",
-                f'cdp deposit {result["deposit_amount"]} {result["deposit_token"]}',
-            )
-        )
-
-        return caajs
-
-    @classmethod
-    def __get_withdraw_cdp_caajs(
-        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
-        token_original_id = KavaPlugin._get_token_original_id(result["withdraw_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
                 transaction.get_timestamp(),
                 cls.platform,
                 cls.application,
@@ -460,380 +527,353 @@ class KavaPlugin:
                 address,
                 f'cdp withdraw {result["withdraw_amount"]} {result["withdraw_token"]}',
             )
+
+    @classmethod
+    def __get_deposit_cdp_caajs(
+        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
+    ) -> Iterator[CaajJournal]:
+        token_original_id = KavaPlugin._get_token_original_id(result["deposit_token"])
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp deposit",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "deposit",
+            result["deposit_amount"],
+            uti,
+            address,
+            "kava_cdp",
+            f'cdp deposit {result["deposit_amount"]} {result["deposit_token"]}',
         )
 
-        return caajs
+    @classmethod
+    def __get_withdraw_cdp_caajs(
+        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
+    ) -> Iterator[CaajJournal]:
+        token_original_id = KavaPlugin._get_token_original_id(result["withdraw_token"])
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp withdraw",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "withdraw",
+            result["withdraw_amount"],
+            uti,
+            "kava_cdp",
+            address,
+            f'cdp withdraw {result["withdraw_amount"]} {result["withdraw_token"]}',
+        )
 
     @classmethod
     def __get_claim_usdx_minting_reward_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(
             result["rewards"][0]["reward_token"]
         )
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "cdp claim reward",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "get",
-                result["rewards"][0]["reward_amount"],
-                uti,
-                "kava_cdp",
-                address,
-                f'cdp reward {result["rewards"][0]["reward_amount"]} {result["rewards"][0]["reward_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "cdp claim reward",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "get",
+            result["rewards"][0]["reward_amount"],
+            uti,
+            "kava_cdp",
+            address,
+            f'cdp reward {result["rewards"][0]["reward_amount"]} {result["rewards"][0]["reward_token"]}',
         )
 
-        return caajs
-
     @classmethod
     def __get_hard_withdraw_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(
             result["hard_withdraw_token"]
         )
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "hard withdraw",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "withdraw",
-                result["hard_withdraw_amount"],
-                uti,
-                "hard_lending",
-                address,
-                f'hard withdraw {result["hard_withdraw_amount"]} {result["hard_withdraw_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "hard withdraw",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "withdraw",
+            result["hard_withdraw_amount"],
+            uti,
+            "hard_lending",
+            address,
+            f'hard withdraw {result["hard_withdraw_amount"]} {result["hard_withdraw_token"]}',
         )
 
-        return caajs
-
     @classmethod
     def __get_hard_deposit_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(
             result["hard_deposit_token"]
         )
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "hard deposit",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "deposit",
-                result["hard_deposit_amount"],
-                uti,
-                address,
-                "hard_lending",
-                f'hard deposit {result["hard_deposit_amount"]} {result["hard_deposit_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "hard deposit",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "deposit",
+            result["hard_deposit_amount"],
+            uti,
+            address,
+            "hard_lending",
+            f'hard deposit {result["hard_deposit_amount"]} {result["hard_deposit_token"]}',
         )
 
-        return caajs
-
     @classmethod
     def __get_hard_borrow_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(
             result["hard_borrow_token"]
         )
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "hard borrow",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "borrow",
-                result["hard_borrow_amount"],
-                uti,
-                "hard_lending",
-                address,
-                f'hard borrow {result["hard_borrow_amount"]} {result["hard_borrow_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "hard borrow",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "borrow",
+            result["hard_borrow_amount"],
+            uti,
+            "hard_lending",
+            address,
+            f'hard borrow {result["hard_borrow_amount"]} {result["hard_borrow_token"]}',
         )
 
-        return caajs
-
     @classmethod
     def __get_hard_repay_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         token_original_id = KavaPlugin._get_token_original_id(
             result["hard_repay_token"]
         )
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "hard repay",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "repay",
-                result["hard_repay_amount"],
-                uti,
-                address,
-                "hard_lending",
-                f'hard repay {result["hard_repay_amount"]} {result["hard_repay_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "hard repay",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "repay",
+            result["hard_repay_amount"],
+            uti,
+            address,
+            "hard_lending",
+            f'hard repay {result["hard_repay_amount"]} {result["hard_repay_token"]}',
         )
 
-        return caajs
-
     @classmethod
     def __get_claim_hard_reward_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
+        executed_at = transaction.get_timestamp()
+        transaction_id = transaction.get_transaction_id()
         for reward in result["rewards"]:
             token_original_id = KavaPlugin._get_token_original_id(
                 reward["reward_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "claim hard reward",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "get",
-                    reward["reward_amount"],
-                    uti,
-                    "hard_lending",
-                    address,
-                    f'hard lending reward receive {reward["reward_amount"]} {reward["reward_token"]}',
-                )
-            )
-
-        return caajs
-
-    @classmethod
-    def __get_swap_exact_for_tokens_caajs(
-        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
-        token_original_id = KavaPlugin._get_token_original_id(result["input_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
+                executed_at,
                 cls.platform,
                 cls.application,
-                "swap exact for tokens",
-                transaction.get_transaction_id(),
+                "claim hard reward",
+                transaction_id,
                 trade_uuid,
-                "lose",
-                result["input_amount"],
+                "get",
+                reward["reward_amount"],
                 uti,
+                "hard_lending",
                 address,
-                "kava_swap",
-                f'buy {result["output_amount"]} {result["output_token"]} sell {result["input_amount"]} {result["input_token"]}',
+                f'hard lending reward receive {reward["reward_amount"]} {reward["reward_token"]}',
             )
+
+    @classmethod
+    def __get_swap_exact_for_tokens_caajs(
+        cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
+    ) -> Iterator[CaajJournal]:
+        token_original_id = KavaPlugin._get_token_original_id(result["input_token"])
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "swap exact for tokens",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "lose",
+            result["input_amount"],
+            uti,
+            address,
+            "kava_swap",
+            f'buy {result["output_amount"]} {result["output_token"]} sell {result["input_amount"]} {result["input_token"]}',
         )
 
         token_original_id = KavaPlugin._get_token_original_id(result["output_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "swap exact for tokens",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "get",
-                result["output_amount"],
-                uti,
-                "kava_swap",
-                address,
-                f'buy {result["output_amount"]} {result["output_token"]} sell {result["input_amount"]} {result["input_token"]}',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "swap exact for tokens",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "get",
+            result["output_amount"],
+            uti,
+            "kava_swap",
+            address,
+            f'buy {result["output_amount"]} {result["output_token"]} sell {result["input_amount"]} {result["input_token"]}',
         )
 
         token_original_id = KavaPlugin._get_token_original_id(result["fee_token"])
-        uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                "swap exact for tokens",
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "lose",
-                result["fee_amount"],
-                uti,
-                address,
-                "kava_swap",
-                f'pay {result["fee_amount"]} {result["fee_token"]} as swap fee',
-            )
+        uti = KavaPlugin._get_uti(token_table, token_original_id)
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "swap exact for tokens",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "lose",
+            result["fee_amount"],
+            uti,
+            address,
+            "kava_swap",
+            f'pay {result["fee_amount"]} {result["fee_token"]} as swap fee',
         )
 
-        return caajs
-
     @classmethod
     def __get_swap_deposit_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
+    ) -> Iterator[CaajJournal]:
+        uti = KavaPlugin._get_uti(token_table, result["share_token"])
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "swap deposit",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "get_bonds",
+            result["share_amount"],
+            uti,
+            "kava_swap",
+            address,
+            f'kava swap receive {result["share_amount"]} {result["share_token"]}',
+        )
 
-        uti = token_table.get_uti(KavaPlugin.platform, result["share_token"])
-        caajs.append(
-            CaajJournal(
+        for input in result["inputs"]:
+            token_original_id = KavaPlugin._get_token_original_id(input["input_token"])
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
                 transaction.get_timestamp(),
                 cls.platform,
                 cls.application,
                 "swap deposit",
                 transaction.get_transaction_id(),
                 trade_uuid,
-                "get_bonds",
-                result["share_amount"],
+                "deposit",
+                input["input_amount"],
                 uti,
-                "kava_swap",
                 address,
-                f'kava swap receive {result["share_amount"]} {result["share_token"]}',
-            )
-        )
-
-        for input in result["inputs"]:
-            token_original_id = KavaPlugin._get_token_original_id(input["input_token"])
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "swap deposit",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "deposit",
-                    input["input_amount"],
-                    uti,
-                    address,
-                    "kava_swap",
-                    f'kava swap send {input["input_amount"]} {input["input_token"]}',
-                )
+                "kava_swap",
+                f'kava swap send {input["input_amount"]} {input["input_token"]}',
             )
 
-        return caajs
-
     @classmethod
     def __get_swap_withdraw_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
+    ) -> Iterator[CaajJournal]:
+        uti = KavaPlugin._get_uti(token_table, result["share_token"])
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            "swap withdraw",
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "lose_bonds",
+            result["share_amount"],
+            uti,
+            address,
+            "kava_swap",
+            f'kava swap send {result["share_amount"]} {result["share_token"]}',
+        )
 
-        uti = token_table.get_uti(KavaPlugin.platform, result["share_token"])
-        caajs.append(
-            CaajJournal(
+        for output in result["outputs"]:
+            token_original_id = KavaPlugin._get_token_original_id(
+                output["output_token"]
+            )
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
                 transaction.get_timestamp(),
                 cls.platform,
                 cls.application,
                 "swap withdraw",
                 transaction.get_transaction_id(),
                 trade_uuid,
-                "lose_bonds",
-                result["share_amount"],
+                "withdraw",
+                output["output_amount"],
                 uti,
-                address,
                 "kava_swap",
-                f'kava swap send {result["share_amount"]} {result["share_token"]}',
-            )
-        )
-
-        for output in result["outputs"]:
-            token_original_id = KavaPlugin._get_token_original_id(
-                output["output_token"]
-            )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "swap withdraw",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "withdraw",
-                    output["output_amount"],
-                    uti,
-                    "kava_swap",
-                    address,
-                    f'kava swap receive {output["output_amount"]} {output["output_token"]}',
-                )
+                address,
+                f'kava swap receive {output["output_amount"]} {output["output_token"]}',
             )
 
-        return caajs
-
     @classmethod
     def __get_claim_swap_reward_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
+        executed_at = transaction.get_timestamp()
+        transaction_id = transaction.get_transaction_id()
         for reward in result["rewards"]:
             token_original_id = KavaPlugin._get_token_original_id(
                 reward["reward_token"]
             )
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "claim swap reward",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    "get",
-                    reward["reward_amount"],
-                    uti,
-                    "kava_swap",
-                    address,
-                    f'kava swap reward receive {reward["reward_amount"]} {reward["reward_token"]}',
-                )
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
+                executed_at,
+                cls.platform,
+                cls.application,
+                "claim swap reward",
+                transaction_id,
+                trade_uuid,
+                "get",
+                reward["reward_amount"],
+                uti,
+                "kava_swap",
+                address,
+                f'kava swap reward receive {reward["reward_amount"]} {reward["reward_token"]}',
             )
 
-        return caajs
-
     @classmethod
     def __get_send_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         recipient = result["recipient"]
         sender = result["sender"]
         if address in [recipient, sender]:
@@ -845,32 +885,26 @@ class KavaPlugin:
                 message = f'{sender} {caaj_type} {result["amount"]} {result["token"]} to {recipient}'
 
             token_original_id = KavaPlugin._get_token_original_id(result["token"])
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "send",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    caaj_type,
-                    result["amount"],
-                    uti,
-                    sender,
-                    recipient,
-                    message,
-                )
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
+                transaction.get_timestamp(),
+                cls.platform,
+                cls.application,
+                "send",
+                transaction.get_transaction_id(),
+                trade_uuid,
+                caaj_type,
+                result["amount"],
+                uti,
+                sender,
+                recipient,
+                message,
             )
 
-        return caajs
-
     @classmethod
     def __get_create_atomic_swap_caajs(
         cls, transaction: KavaTransaction, result, token_table, address, trade_uuid
-    ) -> list:
-        caajs = []
-
+    ) -> Iterator[CaajJournal]:
         recipient = result["recipient"]
         sender = result["sender"]
         if address in [recipient, sender]:
@@ -886,25 +920,39 @@ class KavaPlugin:
                 to_address = "kava_bc_atomic_swap"
 
             token_original_id = KavaPlugin._get_token_original_id(result["token"])
-            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
-            caajs.append(
-                CaajJournal(
-                    transaction.get_timestamp(),
-                    cls.platform,
-                    cls.application,
-                    "create atomic swap",
-                    transaction.get_transaction_id(),
-                    trade_uuid,
-                    caaj_type,
-                    result["amount"],
-                    uti,
-                    from_address,
-                    to_address,
-                    message,
-                )
+            uti = KavaPlugin._get_uti(token_table, token_original_id)
+            yield CaajJournal(
+                transaction.get_timestamp(),
+                cls.platform,
+                cls.application,
+                "create atomic swap",
+                transaction.get_transaction_id(),
+                trade_uuid,
+                caaj_type,
+                result["amount"],
+                uti,
+                from_address,
+                to_address,
+                message,
             )
 
-        return caajs
+    @classmethod
+    def _get_uti(cls, token_table: "TokenOriginalIdTable", token_original_id):
+        try:
+            uti = token_table.get_uti(KavaPlugin.platform, token_original_id)
+        except Exception as e:
+            UTI_MISSES.inc(token_original_id)
+            raise e
+        if uti is None:
+            UTI_MISSES.inc(token_original_id)
+        return uti
+
+    @classmethod
+    def _observe(cls, transaction: KavaTransaction, journals: int, start: float):
+        chain_id = transaction.get_transaction()["header"]["chain_id"]
+        TRANSACTIONS.inc(chain_id)
+        JOURNALS.inc(chain_id, amount=journals)
+        CONVERSION_SECONDS.observe(time.perf_counter() - start, chain_id)
 
     @classmethod
     def _get_uuid(cls) -> str:
@@ -923,24 +971,22 @@ class KavaPlugin:
         cls,
         address: str,
         transaction: KavaTransaction,
-        token_table: TokenOriginalIdTable,
+        token_table: "TokenOriginalIdTable",
         trade_uuid,
-    ) -> list:
-        caajs = []
-        caajs.append(
-            CaajJournal(
-                transaction.get_timestamp(),
-                cls.platform,
-                cls.application,
-                cls.platform,
-                transaction.get_transaction_id(),
-                trade_uuid,
-                "lose",
-                str(transaction.get_transaction_fee() / Decimal(MEGA)),
-                "kava/kava",
-                address,
-                "fee",
-                "",
-            )
+    ) -> Iterator[CaajJournal]:
+        yield CaajJournal(
+            transaction.get_timestamp(),
+            cls.platform,
+            cls.application,
+            cls.platform,
+            transaction.get_transaction_id(),
+            trade_uuid,
+            "lose",
+            str(
+                DECIMAL_CONTEXT.divide(transaction.get_transaction_fee(), Decimal(MEGA))
+            ),
+            "kava/kava",
+            address,
+            "fee",
+            "",
         )
-        return caajs
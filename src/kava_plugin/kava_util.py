@@ -1,11 +1,23 @@
 import logging
 import re
-from decimal import Decimal, getcontext
-from typing import Tuple, Union
+import sys
+from decimal import Context, Decimal
+from typing import Iterator, Optional, Tuple, Union
 
 logger = logging.getLogger(name=__name__)
 logger.addHandler(logging.NullHandler())
-getcontext().prec = 50
+# amounts are computed in an explicit context instead of changing the
+# global (and thread local) decimal context on import
+DECIMAL_CONTEXT = Context(prec=50)
+COIN_PATTERN = re.compile(r"(\d+)(\D.*)?", re.DOTALL)
+UAMOUNT_DECIMALS = 6
+# dict keys, addresses and the values of these keys (event types, attribute keys,
+# denoms, actions) are shared between payloads. other values such as amounts,
+# heights and hashes are unique and are not interned, the table would only grow
+INTERN_KEYS = frozenset(
+    {"type", "@type", "key", "denom", "chain_id", "action", "module"}
+)
+ADDRESS_PREFIXES = ("kava1", "kavavaloper1")
 
 
 class KavaUtil:
@@ -34,6 +46,39 @@ class KavaUtil:
         else:
             return event
 
+    @classmethod
+    def get_string_values(cls, value) -> Iterator[str]:
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for child in value.values():
+                yield from KavaUtil.get_string_values(child)
+        elif isinstance(value, list):
+            for child in value:
+                yield from KavaUtil.get_string_values(child)
+
+    @classmethod
+    def intern_strings(cls, value, key: Optional[str] = None):
+        if isinstance(value, str):
+            if key in INTERN_KEYS or value.startswith(ADDRESS_PREFIXES):
+                return sys.intern(value)
+            return value
+        elif isinstance(value, dict):
+            # the value of an event attribute is named by its key attribute
+            attribute_key = value.get("key")
+            return {
+                sys.intern(child_key): KavaUtil.intern_strings(
+                    child,
+                    attribute_key
+                    if child_key == "value" and isinstance(attribute_key, str)
+                    else child_key,
+                )
+                for child_key, child in value.items()
+            }
+        elif isinstance(value, list):
+            return [KavaUtil.intern_strings(child, key) for child in value]
+        return value
+
     @classmethod
     def convert_uamount_amount(cls, uamount, token=None):
         denominator = 1000000
@@ -44,18 +89,22 @@ class KavaUtil:
                 denominator = 100000000
             elif token == "xrp":
                 denominator = 100000000
-        atom = Decimal(int(uamount)) / Decimal(denominator)
+        atom = DECIMAL_CONTEXT.divide(Decimal(int(uamount)), Decimal(denominator))
         return atom
 
     @classmethod
     def split_amount(cls, amount_token: str) -> Tuple[Union[Decimal, str], str]:
-        amount = re.findall(r"\d+", amount_token)[0]
-        token = amount_token[len(amount) :]
+        match = COIN_PATTERN.match(amount_token)
+        if match is not None:
+            amount, token = match.group(1), match.group(2) or ""
+        else:
+            amount = re.findall(r"\d+", amount_token)[0]
+            token = amount_token[len(amount) :]
         if token == "ukava" or token == "":
             token = "kava"
         elif token == "xrpb":
             token = "xrp"
-        return amount, token
+        return amount, sys.intern(token)
 
     @classmethod
     def get_rewards(cls, event) -> list:
@@ -66,6 +115,19 @@ class KavaUtil:
         amounts = KavaUtil.get_attribute_value(event["attributes"], "amount").split(",")
         for amount in amounts:
             amount, token = KavaUtil.split_amount(amount)
-            amount = str(KavaUtil.convert_uamount_amount(amount))
+            # longer amounts keep the rounding of convert_uamount_amount
+            amount = (
+                KavaUtil.shift_uamount(amount)
+                if len(amount) <= DECIMAL_CONTEXT.prec
+                else str(KavaUtil.convert_uamount_amount(amount))
+            )
             rewards.append({"reward_token": token, "reward_amount": amount})
         return rewards
+
+    @classmethod
+    def shift_uamount(cls, digits: str) -> str:
+        # same string as str(convert_uamount_amount(digits)) without decimal division
+        digits = digits.lstrip("0").zfill(UAMOUNT_DECIMALS + 1)
+        fraction = digits[-UAMOUNT_DECIMALS:].rstrip("0")
+        integer = digits[:-UAMOUNT_DECIMALS]
+        return f"{integer}.{fraction}" if fraction else integer
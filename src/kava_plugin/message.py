@@ -1,100 +1,152 @@
 import logging
-from decimal import getcontext
 from typing import Optional
 
 from kava_plugin.kava_util import KavaUtil
+from kava_plugin.metrics import MESSAGES, UNKNOWN_ACTIONS
 
 logger = logging.getLogger(name=__name__)
 logger.addHandler(logging.NullHandler())
 
-getcontext().prec = 50
-
-DELEGATE_ACTIONS = [
-    "delegate",
-    "begin_redelegate",
-    "claim_delegator_reward",
-    "withdraw_delegator_reward",
-    "/cosmos.staking.v1beta1.MsgBeginRedelegate",
-    "/cosmos.staking.v1beta1.MsgDelegate",
-    "/cosmos.distribution.v1beta1.MsgWithdrawDelegatorReward",
-    "/kava.incentive.v1beta1.MsgClaimDelegatorReward",
-]
+LEGACY_ACTIONS = {
+    "delegate": "delegate",
+    "begin_redelegate": "delegate",
+    "claim_delegator_reward": "delegate",
+    "withdraw_delegator_reward": "delegate",
+    "begin_unbonding": "begin_unbonding",
+    "create_cdp": "create_cdp",
+    "draw_cdp": "draw_cdp",
+    "repay_cdp": "repay_cdp",
+    "deposit_cdp": "deposit_cdp",
+    "withdraw_cdp": "withdraw_cdp",
+    "claim_usdx_minting_reward": "claim_usdx_minting_reward",
+    "claim_reward": "claim_usdx_minting_reward",
+    "hard_deposit": "hard_deposit",
+    "harvest_deposit": "hard_deposit",
+    "hard_withdraw": "hard_withdraw",
+    "harvest_withdraw": "hard_withdraw",
+    "hard_borrow": "hard_borrow",
+    "hard_repay": "hard_repay",
+    "claim_hard_reward": "claim_hard_reward",
+    "claim_harvest_reward": "claim_hard_reward",
+    "swap_exact_for_tokens": "swap_exact_for_tokens",
+    "swap_for_exact_tokens": "swap_exact_for_tokens",
+    "swap_deposit": "swap_deposit",
+    "swap_withdraw": "swap_withdraw",
+    "claim_swap_reward": "claim_swap_reward",
+    "send": "send",
+    "createAtomicSwap": "create_atomic_swap",
+    "claimAtomicSwap": "claim_atomic_swap",
+    "refundAtomicSwap": "claim_atomic_swap",
+    "vote": "vote",
+    "committee_vote": "vote",
+    "post_price": "vote",
+}
+
+# from kava-9 the action attribute is the type url of the message
+KAVA_9_ACTIONS = {
+    "/cosmos.staking.v1beta1.MsgBeginRedelegate": "delegate",
+    "/cosmos.staking.v1beta1.MsgDelegate": "delegate",
+    "/cosmos.distribution.v1beta1.MsgWithdrawDelegatorReward": "delegate",
+    "/kava.incentive.v1beta1.MsgClaimDelegatorReward": "delegate",
+    "/cosmos.staking.v1beta1.MsgUndelegate": "begin_unbonding",
+    "/kava.incentive.v1beta1.MsgClaimHardReward": "claim_hard_reward",
+    "/cosmos.bank.v1beta1.MsgSend": "send",
+    "/kava.bep3.v1beta1.MsgCreateAtomicSwap": "create_atomic_swap",
+}
 
 
 class Message:
-    def __init__(self, logs_events, messages_events, height, chain_id):
+    def __init__(
+        self,
+        logs_events,
+        messages_events,
+        height,
+        chain_id,
+        actions=None,
+        action=None,
+    ):
         self.logs_events = logs_events
         self.messages_events = messages_events
         self.height = height
         self.chain_id = chain_id
-
-    def get_action(self) -> Optional[str]:
-        event = KavaUtil.get_event_value(self.logs_events, "message")
+        self.actions = (
+            actions
+            if actions is not None
+            else Message.get_actions(int(chain_id.rsplit("-", 1)[-1]))
+        )
+        # the action may already be read by a MessageView
+        self.action = action
+
+    @classmethod
+    def get_actions(cls, platform_version: int) -> dict:
+        return LEGACY_ACTIONS if platform_version < 9 else KAVA_9_ACTIONS
+
+    @classmethod
+    def read_action(cls, logs_events) -> Optional[str]:
+        event = KavaUtil.get_event_value(logs_events, "message")
         if event is not None:
             action = KavaUtil.get_attribute_value(event["attributes"], "action")
         else:
             action = None
         return action
 
+    def get_action(self) -> Optional[str]:
+        if self.action is None:
+            self.action = Message.read_action(self.logs_events)
+        return self.action
+
     def get_result(self) -> dict:
         action = self.get_action()
         logger.debug(action)
         result = {"action": None, "result": None}
-        if action in DELEGATE_ACTIONS:
+        normalized_action = self.actions.get(action)
+        if normalized_action == "delegate":
             result = self.__as_delegate()
-        elif (
-            action == "begin_unbonding"
-            or action == "/cosmos.staking.v1beta1.MsgUndelegate"
-        ):
+        elif normalized_action == "begin_unbonding":
             result = self.__as_begin_unbonding()
-        elif action == "create_cdp":
+        elif normalized_action == "create_cdp":
             result = self.__as_create_cdp()
-        elif action == "draw_cdp":
+        elif normalized_action == "draw_cdp":
             result = self.__as_draw_cdp()
-        elif action == "repay_cdp":
+        elif normalized_action == "repay_cdp":
             result = self.__as_repay_cdp()
-        elif action == "deposit_cdp":
+        elif normalized_action == "deposit_cdp":
             result = self.__as_deposit_cdp()
-        elif action == "withdraw_cdp":
+        elif normalized_action == "withdraw_cdp":
             result = self.__as_withdraw_cdp()
-        elif action == "claim_usdx_minting_reward" or action == "claim_reward":
+        elif normalized_action == "claim_usdx_minting_reward":
             result = self.__as_claim_usdx_minting_reward()
-        elif action == "hard_deposit" or action == "harvest_deposit":
+        elif normalized_action == "hard_deposit":
             result = self.__as_hard_deposit()
-        elif action == "hard_withdraw" or action == "harvest_withdraw":
+        elif normalized_action == "hard_withdraw":
             result = self.__as_hard_withdraw()
-        elif action == "hard_borrow":
+        elif normalized_action == "hard_borrow":
             result = self.__as_hard_borrow()
-        elif action == "hard_repay":
+        elif normalized_action == "hard_repay":
             result = self.__as_hard_repay()
-        elif action in [
-            "claim_hard_reward",
-            "claim_harvest_reward",
-            "/kava.incentive.v1beta1.MsgClaimHardReward",
-        ]:
+        elif normalized_action == "claim_hard_reward":
             result = self.__as_claim_hard_reward()
-        elif action == "swap_exact_for_tokens" or action == "swap_for_exact_tokens":
+        elif normalized_action == "swap_exact_for_tokens":
             result = self.__as_swap_exact_for_tokens()
-        elif action == "swap_deposit":
+        elif normalized_action == "swap_deposit":
             result = self.__as_swap_deposit()
-        elif action == "swap_withdraw":
+        elif normalized_action == "swap_withdraw":
             result = self.__as_swap_withdraw()
-        elif action == "claim_swap_reward":
+        elif normalized_action == "claim_swap_reward":
             result = self.__as_claim_swap_reward()
-        elif action == "send" or action == "/cosmos.bank.v1beta1.MsgSend":
+        elif normalized_action == "send":
             result = self.__as_send()
-        elif (
-            action == "createAtomicSwap"
-            or action == "/kava.bep3.v1beta1.MsgCreateAtomicSwap"
-        ):
+        elif normalized_action == "create_atomic_swap":
             result = self.__as_create_atomic_swap()
-        elif action == "claimAtomicSwap" or action == "refundAtomicSwap":
+        elif normalized_action == "claim_atomic_swap":
             result = self.__as_claim_atomic_swap()
-        elif action in ["vote", "committee_vote", "post_price"]:
+        elif normalized_action == "vote":
             result = {"action": "vote", "result": None}
         else:
-            logger.error(f"unknown action: {action}")
+            logger.error(f"unknown action: {action} chain_id: {self.chain_id}")
+            UNKNOWN_ACTIONS.inc(action, self.chain_id)
 
+        MESSAGES.inc(result["action"] or "unknown", self.chain_id)
         return result
 
     def __as_delegate(self):
@@ -0,0 +1,60 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_MAX_SIZE = 10000
+
+
+class MessageCache:
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        if max_size <= 0:
+            raise ValueError(f"max_size must be positive. max_size: {max_size}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, transaction_id: str) -> Optional[list]:
+        with self._lock:
+            results = self._results.get(transaction_id)
+            if results is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(transaction_id)
+            self.hits += 1
+            return results
+
+    def put(self, transaction_id: str, results: list) -> None:
+        with self._lock:
+            self._results[transaction_id] = results
+            self._results.move_to_end(transaction_id)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def get_hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._results),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.get_hit_rate(),
+        }
+
+    def __len__(self) -> int:
+        return len(self._results)
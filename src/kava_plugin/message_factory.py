@@ -1,20 +1,89 @@
 import json
 import logging
-from decimal import getcontext
+from typing import Callable, Dict, Optional
 
 from senkalib.platform.kava.kava_transaction import KavaTransaction
 
-from kava_plugin.message import Message
+from kava_plugin.message import KAVA_9_ACTIONS, LEGACY_ACTIONS, Message
 
 logger = logging.getLogger(name=__name__)
 logger.addHandler(logging.NullHandler())
 
-getcontext().prec = 50
+# normalized actions of messages that never produce journals
+NO_JOURNAL_ACTIONS = {"vote"}
+
+
+class MessageExtractor:
+    def __init__(self, get_messages_events: Callable[[dict], list], actions: dict):
+        self.get_messages_events = get_messages_events
+        self.actions = actions
+
+
+class MessageView:
+    def __init__(
+        self,
+        transaction: dict,
+        index: int,
+        logs_events: list,
+        extractor: MessageExtractor,
+    ):
+        self.transaction = transaction
+        self.index = index
+        self.logs_events = logs_events
+        self.extractor = extractor
+        self._action: Optional[str] = None
+
+    def get_action(self) -> Optional[str]:
+        # reads only the message event of the log entry
+        if self._action is None:
+            self._action = Message.read_action(self.logs_events)
+        return self._action
+
+    def get_normalized_action(self) -> Optional[str]:
+        return self.extractor.actions.get(self.get_action())
+
+    def get_result(self) -> dict:
+        return self.get_message().get_result()
+
+    def get_message(self) -> Message:
+        # messages without journals are never read, only their action
+        messages_events = (
+            self.extractor.get_messages_events(self.transaction)[self.index]
+            if self.get_normalized_action() not in NO_JOURNAL_ACTIONS
+            else None
+        )
+        return Message(
+            self.logs_events,
+            messages_events,
+            self.transaction["data"]["height"],
+            self.transaction["header"]["chain_id"],
+            self.extractor.actions,
+            self.get_action(),
+        )
+
+
+LEGACY_EXTRACTOR = MessageExtractor(
+    lambda transaction: transaction["data"]["tx"]["value"]["msg"],
+    LEGACY_ACTIONS,
+)
+KAVA_9_EXTRACTOR = MessageExtractor(
+    lambda transaction: transaction["data"]["tx"]["body"]["messages"],
+    KAVA_9_ACTIONS,
+)
 
 
 class MessageFactory:
+    _extractors: Dict[str, MessageExtractor] = {}
+
     @classmethod
     def get_messages(cls, kava_transaction: KavaTransaction) -> list:
+        return [
+            view.get_message()
+            for view in MessageFactory.get_message_views(kava_transaction)
+        ]
+
+    @classmethod
+    def get_message_views(cls, kava_transaction: KavaTransaction) -> list:
         transaction = kava_transaction.get_transaction()
         try:
             log_events = list(map(lambda x: x["events"], transaction["data"]["logs"]))
@@ -22,20 +91,21 @@ class MessageFactory:
             logger.error("get_messages failed. can not get log_event transaction:")
             logger.error(json.dumps(transaction))
             raise e
-        messages_events = (
-            transaction["data"]["tx"]["value"]["msg"]
-            if kava_transaction.get_platform_version() < 9
-            else transaction["data"]["tx"]["body"]["messages"]
-        )
-        messages = []
-        for i, log_event in enumerate(log_events):
-            messages.append(
-                Message(
-                    log_event,
-                    messages_events[i],
-                    transaction["data"]["height"],
-                    transaction["header"]["chain_id"],
-                )
-            )
+        extractor = MessageFactory.get_extractor(kava_transaction)
+        return [
+            MessageView(transaction, i, log_event, extractor)
+            for i, log_event in enumerate(log_events)
+        ]
 
-        return messages
+    @classmethod
+    def get_extractor(cls, kava_transaction: KavaTransaction) -> MessageExtractor:
+        chain_id = kava_transaction.get_transaction()["header"]["chain_id"]
+        extractor = MessageFactory._extractors.get(chain_id)
+        if extractor is None:
+            extractor = (
+                LEGACY_EXTRACTOR
+                if kava_transaction.get_platform_version() < 9
+                else KAVA_9_EXTRACTOR
+            )
+            MessageFactory._extractors[chain_id] = extractor
+        return extractor
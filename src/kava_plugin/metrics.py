@@ -0,0 +1,245 @@
+import abc
+import logging
+import os
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Dict, Iterator, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Metric(abc.ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get_samples(self) -> Iterator[Sample]:
+        pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self.values = {}
+
+    @abc.abstractmethod
+    def snapshot(self) -> dict:
+        pass
+
+    @abc.abstractmethod
+    def merge(self, snapshot: dict) -> None:
+        pass
+
+    def _get_key(self, labelvalues: tuple) -> tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}. labels: {labelvalues}"
+            )
+        return tuple(str(value) for value in labelvalues)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._get_key(labelvalues)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, *labelvalues) -> float:
+        return self.values.get(self._get_key(labelvalues), 0.0)
+
+    def get_samples(self) -> Iterator[Sample]:
+        for key, value in sorted(self.values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+    def snapshot(self) -> dict:
+        return dict(self.values)
+
+    def merge(self, snapshot: dict) -> None:
+        with self._lock:
+            for key, value in snapshot.items():
+                self.values[key] = self.values.get(key, 0.0) + value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._get_key(labelvalues)
+        with self._lock:
+            # bucket counts followed by sum and count
+            observation = self.values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    observation[i] += 1
+            observation[-2] += value
+            observation[-1] += 1
+
+    def get_count(self, *labelvalues) -> float:
+        observation = self.values.get(self._get_key(labelvalues))
+        return observation[-1] if observation is not None else 0.0
+
+    def get_samples(self) -> Iterator[Sample]:
+        for key, observation in sorted(self.values.items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, observation):
+                yield f"{self.name}_bucket", {**labels, "le": repr(bound)}, count
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, observation[-1]
+            yield f"{self.name}_sum", labels, observation[-2]
+            yield f"{self.name}_count", labels, observation[-1]
+
+    def snapshot(self) -> dict:
+        return {key: list(observation) for key, observation in self.values.items()}
+
+    def merge(self, snapshot: dict) -> None:
+        with self._lock:
+            for key, observation in snapshot.items():
+                current = self.values.setdefault(key, [0.0] * len(observation))
+                for i, value in enumerate(observation):
+                    current[i] += value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        counter = Counter(name, documentation, labelnames)
+        self._register(counter)
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._register(histogram)
+        return histogram
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.get_samples():
+                lines.append(
+                    f"{name}{MetricsRegistry._format_labels(labels)} {MetricsRegistry._format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        # write atomically so a textfile collector never reads a partial file
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, delete=False, encoding="utf-8", suffix=".tmp"
+        ) as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(metrics_file.name, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def merge(self, snapshot: dict) -> None:
+        for name, values in snapshot.items():
+            self.metrics[name].merge(values)
+
+    def _register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"metric is already registered. name: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    @classmethod
+    def _format_labels(cls, labels: Dict[str, str]) -> str:
+        if len(labels) == 0:
+            return ""
+        values = []
+        for key, value in labels.items():
+            value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            values.append(f'{key}="{value}"')
+        return "{" + ",".join(values) + "}"
+
+    @classmethod
+    def _format_value(cls, value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+REGISTRY = MetricsRegistry()
+
+TRANSACTIONS = REGISTRY.counter(
+    "kava_plugin_transactions_total", "Transactions converted.", ["chain_id"]
+)
+MESSAGES = REGISTRY.counter(
+    "kava_plugin_messages_total", "Messages parsed.", ["action", "chain_id"]
+)
+JOURNALS = REGISTRY.counter(
+    "kava_plugin_journals_total", "Journals emitted.", ["chain_id"]
+)
+UNKNOWN_ACTIONS = REGISTRY.counter(
+    "kava_plugin_unknown_actions_total",
+    "Messages with an action that is not defined.",
+    ["action", "chain_id"],
+)
+UTI_MISSES = REGISTRY.counter(
+    "kava_plugin_uti_misses_total",
+    "Token original ids without a uti in the token table.",
+    ["token_original_id"],
+)
+CONVERSION_SECONDS = REGISTRY.histogram(
+    "kava_plugin_transaction_conversion_seconds",
+    "Time to convert one transaction into journals.",
+    ["chain_id"],
+)
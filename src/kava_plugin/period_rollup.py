@@ -0,0 +1,85 @@
+import csv
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.journal_sorter import FIELD_NAMES
+from kava_plugin.kava_util import DECIMAL_CONTEXT
+
+PERIODS = ("day", "month", "quarter", "year")
+DEFAULT_GROUP_BY = ("uti", "type")
+
+
+class PeriodRollup:
+    count_name = "journals"
+    # get and lose journals of the same uti would cancel out without the type
+    required_fields: Tuple[str, ...] = ("type",)
+
+    def __init__(
+        self, period: str = "month", group_by: Sequence[str] = DEFAULT_GROUP_BY
+    ):
+        if period not in PERIODS:
+            raise ValueError(f"unknown period: {period}. periods: {', '.join(PERIODS)}")
+        invalid_fields = [
+            field for field in group_by if field not in FIELD_NAMES or field == "amount"
+        ]
+        if len(invalid_fields) > 0:
+            raise ValueError(
+                f"journals can not be grouped by {', '.join(invalid_fields)}. fields: {', '.join(FIELD_NAMES)}"
+            )
+        missing_fields = [
+            field for field in self.required_fields if field not in group_by
+        ]
+        if len(missing_fields) > 0:
+            raise ValueError(
+                f"journals must be grouped by {', '.join(missing_fields)}. group by: {', '.join(group_by)}"
+            )
+        self.period = period
+        self.group_by = tuple(group_by)
+        self.amounts: Dict[tuple, Decimal] = {}
+        self.counts: Dict[tuple, int] = {}
+
+    def track(self, caajs: Iterable[CaajJournal]) -> Iterator[CaajJournal]:
+        for caaj in caajs:
+            self.add(caaj)
+            yield caaj
+
+    def add(self, caaj: CaajJournal) -> None:
+        key = (
+            PeriodRollup.get_period(str(caaj.executed_at), self.period),
+            *(getattr(caaj, field) for field in self.group_by),
+        )
+        self.amounts[key] = DECIMAL_CONTEXT.add(
+            self.amounts.get(key, Decimal(0)), Decimal(caaj.amount)
+        )
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def extend(self, caajs: Iterable[CaajJournal]) -> None:
+        for caaj in caajs:
+            self.add(caaj)
+
+    def get_field_names(self) -> List[str]:
+        return ["period", *self.group_by, "amount", self.count_name]
+
+    def get_rows(self) -> List[list]:
+        return [
+            [*key, str(self.amounts[key]), self.counts[key]]
+            for key in sorted(self.amounts, key=lambda key: tuple(map(str, key)))
+        ]
+
+    def write_csv(self, stream) -> None:
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(self.get_field_names())
+        writer.writerows(self.get_rows())
+
+    @classmethod
+    def get_period(cls, executed_at: str, period: str) -> str:
+        # executed_at is formatted as 2022-03-01 12:34:56
+        if period == "day":
+            return executed_at[:10]
+        if period == "month":
+            return executed_at[:7]
+        if period == "quarter":
+            return f"{executed_at[:4]}-Q{(int(executed_at[5:7]) - 1) // 3 + 1}"
+        return executed_at[:4]
@@ -0,0 +1,134 @@
+import csv
+import dataclasses
+import json
+import logging
+import os
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.balance_tracker import ACCOUNTS, BalanceTracker
+from kava_plugin.kava_util import DECIMAL_CONTEXT
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+STATE_VERSION = 2
+# position and sign of the journals of each module account
+POSITIONS = {
+    ("kava_cdp", "deposit"): ("cdp_collateral", 1),
+    ("kava_cdp", "withdraw"): ("cdp_collateral", -1),
+    ("kava_cdp", "borrow"): ("cdp_debt", 1),
+    ("kava_cdp", "repay"): ("cdp_debt", -1),
+    ("hard_lending", "deposit"): ("hard_supplied", 1),
+    ("hard_lending", "withdraw"): ("hard_supplied", -1),
+    ("hard_lending", "borrow"): ("hard_borrowed", 1),
+    ("hard_lending", "repay"): ("hard_borrowed", -1),
+    ("kava_swap", "get_bonds"): ("pool_shares", 1),
+    ("kava_swap", "lose_bonds"): ("pool_shares", -1),
+}
+
+PositionKey = Tuple[str, str, Optional[str]]
+
+
+@dataclasses.dataclass(frozen=True)
+class Position:
+    address: str
+    position: str
+    uti: Optional[str]
+    amount: str
+
+
+POSITION_FIELD_NAMES = [field.name for field in dataclasses.fields(Position)]
+
+
+class PositionTracker:
+    def __init__(self):
+        self.amounts: Dict[PositionKey, Decimal] = {}
+        # transactions applied per address. journals of transactions in the
+        # loaded state were applied by a previous run and are skipped
+        self.transaction_ids: Dict[str, Set[str]] = {}
+        self._loaded_transaction_ids: Dict[str, Set[str]] = {}
+
+    def track(self, caajs: Iterable[CaajJournal]) -> Iterator[CaajJournal]:
+        for caaj in caajs:
+            self.add(caaj)
+            yield caaj
+
+    def add(self, caaj: CaajJournal) -> None:
+        address = BalanceTracker.get_address(caaj)
+        if caaj.transaction_id in self._loaded_transaction_ids.get(address, ()):
+            return
+
+        module = caaj.caaj_to if caaj.caaj_to in ACCOUNTS else caaj.caaj_from
+        position = POSITIONS.get((module, caaj.type))
+        if position is None:
+            return
+        # only transactions that changed a position are recorded, so a filtered
+        # run does not hide the positions of its transactions from a later run
+        self.transaction_ids.setdefault(address, set()).add(caaj.transaction_id)
+        name, sign = position
+        key = (address, name, caaj.uti)
+        amount = self.amounts.get(key, Decimal(0))
+        amount = (
+            DECIMAL_CONTEXT.add(amount, Decimal(caaj.amount))
+            if sign > 0
+            else DECIMAL_CONTEXT.subtract(amount, Decimal(caaj.amount))
+        )
+        if amount == 0:
+            self.amounts.pop(key, None)
+        else:
+            self.amounts[key] = amount
+
+    def get_positions(self, addresses: Optional[List[str]] = None) -> List[Position]:
+        return [
+            Position(key[0], key[1], key[2], str(amount))
+            for key, amount in sorted(
+                self.amounts.items(), key=lambda item: tuple(map(str, item[0]))
+            )
+            if addresses is None or key[0] in addresses
+        ]
+
+    def write_csv(self, stream, addresses: Optional[List[str]] = None) -> None:
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(POSITION_FIELD_NAMES)
+        for position in self.get_positions(addresses):
+            writer.writerow(dataclasses.astuple(position))
+
+    def save(self, path: str) -> None:
+        state = {
+            "version": STATE_VERSION,
+            "transaction_ids": {
+                address: sorted(transaction_ids)
+                for address, transaction_ids in sorted(self.transaction_ids.items())
+            },
+            "positions": [
+                dataclasses.asdict(position) for position in self.get_positions()
+            ],
+        }
+        # the previous state is kept until the new one is completely written
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PositionTracker":
+        tracker = PositionTracker()
+        if not os.path.exists(path):
+            return tracker
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(
+                f"unsupported position state version: {state.get('version')}. path: {path}"
+            )
+        for address, transaction_ids in state["transaction_ids"].items():
+            tracker.transaction_ids[address] = set(transaction_ids)
+            tracker._loaded_transaction_ids[address] = set(transaction_ids)
+        for position in state["positions"]:
+            key = (position["address"], position["position"], position["uti"])
+            tracker.amounts[key] = Decimal(position["amount"])
+        logger.debug(f"loaded {len(tracker.amounts)} positions. path: {path}")
+        return tracker
@@ -0,0 +1,130 @@
+import collections
+import json
+import logging
+import sys
+import threading
+from typing import Optional, Tuple
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_INTERVAL = 0.005
+
+# (module, function, filename, first line number)
+Frame = Tuple[str, str, str, int]
+
+
+class SamplingProfiler:
+    def __init__(
+        self, interval: float = DEFAULT_INTERVAL, thread_id: Optional[int] = None
+    ):
+        if interval <= 0:
+            raise ValueError(f"interval must be positive. interval: {interval}")
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: collections.Counter = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="kava_plugin_profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.debug(f"profiler took {sum(self.samples.values())} samples")
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def get_collapsed(self) -> str:
+        lines = []
+        for stack, count in sorted(self.samples.items()):
+            names = [SamplingProfiler._get_frame_name(frame) for frame in stack]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def get_speedscope(self, name: str = "kava_plugin") -> dict:
+        frames: list = []
+        frame_indexes: dict = {}
+        samples = []
+        weights = []
+        for stack, count in sorted(self.samples.items()):
+            sample = []
+            for frame in stack:
+                if frame not in frame_indexes:
+                    frame_indexes[frame] = len(frames)
+                    frames.append(
+                        {
+                            "name": SamplingProfiler._get_frame_name(frame),
+                            "file": frame[2],
+                            "line": frame[3],
+                        }
+                    )
+                sample.append(frame_indexes[frame])
+            samples.append(sample)
+            weights.append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": name,
+            "exporter": "kava_plugin",
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as profile_file:
+            if path.endswith(".json"):
+                json.dump(self.get_speedscope(), profile_file)
+            else:
+                profile_file.write(self.get_collapsed())
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # type: ignore
+            if frame is not None:
+                self.samples[SamplingProfiler._get_stack(frame)] += 1
+
+    @classmethod
+    def _get_stack(cls, frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                (
+                    frame.f_globals.get("__name__", "?"),
+                    code.co_name,
+                    code.co_filename,
+                    code.co_firstlineno,
+                )
+            )
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    @classmethod
+    def _get_frame_name(cls, frame: Frame) -> str:
+        return f"{frame[0]}:{frame[1]}"
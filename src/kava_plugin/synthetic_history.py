@@ -0,0 +1,188 @@
+import collections
+import copy
+import datetime
+import json
+import logging
+import os
+import random
+import re
+from typing import Iterator, List, Optional
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.message_factory import MessageFactory
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+ADDRESS_PATTERN = re.compile(r"kava1[02-9ac-hj-np-z]{38}")
+COINS_PATTERN = re.compile(r"\d+[a-z][a-z:/]*(,\d+[a-z][a-z:/]*)*")
+COIN_PATTERN = re.compile(r"(\d+)([a-z][a-z:/]*)")
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+REWARD_DENOMS = ("ukava", "hard", "swp", "usdx")
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class SyntheticTemplate:
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        payload = json.loads(text)
+        self.chain_id = payload["header"]["chain_id"]
+        self.version = int(self.chain_id.rsplit("-", 1)[-1])
+        self.timestamp = datetime.datetime.strptime(
+            payload["header"]["timestamp"], TIMESTAMP_FORMAT
+        )
+        self.message_count = len(payload["data"].get("logs", []))
+
+        # the most frequent address is the owner of the transaction and the
+        # other addresses of the messages are counterparties. addresses that
+        # only appear in events are module accounts and are kept
+        counts = collections.Counter(ADDRESS_PATTERN.findall(text))
+        self.owner = counts.most_common(1)[0][0] if len(counts) > 0 else None
+        message_addresses = ADDRESS_PATTERN.findall(json.dumps(payload["data"]["tx"]))
+        self.counterparties = sorted(set(message_addresses) - {self.owner})
+
+        self.is_reward = False
+        if self.message_count > 0:
+            messages = MessageFactory.get_messages(KavaTransaction(payload))
+            action = messages[0].get_action()
+            self.is_reward = action is not None and "reward" in action.lower()
+
+
+class SyntheticHistory:
+    def __init__(
+        self,
+        templates: List[SyntheticTemplate],
+        address: Optional[str] = None,
+        seed: int = 0,
+        max_messages: int = 1,
+        addresses: int = 1000,
+    ):
+        if len(templates) == 0:
+            raise ValueError("at least one template is required")
+        if max_messages <= 0:
+            raise ValueError(
+                f"max_messages must be positive. max_messages: {max_messages}"
+            )
+        self.templates = templates
+        self.address = address
+        self.max_messages = max_messages
+        self.random = random.Random(seed)
+        self.addresses = [
+            SyntheticHistory._get_address(self.random) for _ in range(addresses)
+        ]
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs) -> "SyntheticHistory":
+        templates = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                templates.append(SyntheticTemplate(filename[: -len(".json")], f.read()))
+        return cls(templates, **kwargs)
+
+    def get_payloads(self, count: int) -> Iterator[dict]:
+        versions = sorted({template.version for template in self.templates})
+        for i, version in enumerate(versions):
+            # transactions are spread evenly over the chains and emitted in
+            # height order so the history looks like one fetched from the api
+            version_count = count * (i + 1) // len(versions) - count * i // len(
+                versions
+            )
+            templates = [t for t in self.templates if t.version == version]
+            height = self.random.randint(1, 100000)
+            timestamp = min(template.timestamp for template in templates)
+            for _ in range(version_count):
+                height += self.random.randint(1, 50)
+                timestamp += datetime.timedelta(seconds=self.random.randint(1, 300))
+                template = self.random.choice(templates)
+                yield self._get_payload(template, height, timestamp)
+
+    def get_transactions(self, count: int) -> Iterator[KavaTransaction]:
+        for payload in self.get_payloads(count):
+            yield KavaTransaction(payload)
+
+    def write(self, stream, count: int) -> None:
+        for payload in self.get_payloads(count):
+            stream.write(json.dumps(payload) + "\n")
+
+    def _get_payload(
+        self, template: SyntheticTemplate, height: int, timestamp: datetime.datetime
+    ) -> dict:
+        addresses = {
+            counterparty: self.random.choice(self.addresses)
+            for counterparty in template.counterparties
+        }
+        if template.owner is not None:
+            addresses[template.owner] = self.address or self.random.choice(
+                self.addresses
+            )
+        text = ADDRESS_PATTERN.sub(
+            lambda match: addresses.get(match.group(0), match.group(0)), template.text
+        )
+        payload = json.loads(text)
+
+        payload["header"]["id"] = self.random.randint(1, 10**8)
+        payload["header"]["block_id"] = height
+        payload["header"]["timestamp"] = timestamp.strftime(TIMESTAMP_FORMAT)
+        payload["data"]["height"] = str(height)
+        payload["data"]["timestamp"] = payload["header"]["timestamp"]
+        payload["data"]["txhash"] = "%064X" % self.random.getrandbits(256)
+
+        # one scale factor per transaction keeps amounts that match across
+        # events and messages equal
+        factor = self.random.uniform(0.01, 100.0)
+        amounts: dict = {}
+        denoms: dict = {}
+        if template.is_reward:
+            for denom in REWARD_DENOMS:
+                denoms[denom] = self.random.choice(REWARD_DENOMS)
+        SyntheticHistory._vary(payload["data"], factor, amounts, denoms)
+
+        message_count = self.random.randint(1, self.max_messages)
+        if template.message_count == 1 and message_count > 1:
+            SyntheticHistory._repeat_message(payload, message_count)
+        return payload
+
+    @classmethod
+    def _vary(cls, value, factor: float, amounts: dict, denoms: dict):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                if key == "amount" and isinstance(child, str) and child.isdigit():
+                    value[key] = SyntheticHistory._scale(child, factor, amounts)
+                elif isinstance(child, str) and COINS_PATTERN.fullmatch(child):
+                    value[key] = ",".join(
+                        SyntheticHistory._scale(amount, factor, amounts)
+                        + denoms.get(denom, denom)
+                        for amount, denom in COIN_PATTERN.findall(child)
+                    )
+                else:
+                    SyntheticHistory._vary(child, factor, amounts, denoms)
+        elif isinstance(value, list):
+            for child in value:
+                SyntheticHistory._vary(child, factor, amounts, denoms)
+
+    @classmethod
+    def _scale(cls, amount: str, factor: float, amounts: dict) -> str:
+        if amount not in amounts:
+            amounts[amount] = str(max(1, int(int(amount) * factor)))
+        return amounts[amount]
+
+    @classmethod
+    def _repeat_message(cls, payload: dict, count: int) -> None:
+        transaction = KavaTransaction(payload)
+        extractor = MessageFactory.get_extractor(transaction)
+        messages = extractor.get_messages_events(payload)
+        logs = payload["data"]["logs"]
+        for i in range(1, count):
+            log = copy.deepcopy(logs[0])
+            log["msg_index"] = i
+            logs.append(log)
+            messages.append(copy.deepcopy(messages[0]))
+
+    @classmethod
+    def _get_address(cls, generator: random.Random) -> str:
+        # the checksum is not valid bech32, which the converter does not check
+        return "kava1" + "".join(generator.choice(BECH32_CHARSET) for _ in range(38))
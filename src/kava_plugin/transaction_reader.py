@@ -0,0 +1,124 @@
+import contextlib
+import gzip
+import io
+import json
+import logging
+import shutil
+import subprocess
+from typing import IO, Iterable, Iterator
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.kava_util import KavaUtil
+
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+GZIP_SUFFIXES = (".gz",)
+ZSTD_SUFFIXES = (".zst", ".zstd")
+
+
+class TransactionReader:
+    @classmethod
+    def read(cls, path: str) -> Iterator[KavaTransaction]:
+        for transaction in TransactionReader.read_raw(path):
+            yield KavaTransaction(transaction)
+
+    @classmethod
+    def read_many(
+        cls, paths: Iterable[str], unique: bool = False
+    ) -> Iterator[KavaTransaction]:
+        if not unique:
+            for path in paths:
+                yield from TransactionReader.read(path)
+            return
+        # archives of related addresses or overlapping exports share transactions.
+        # the id of every transaction read is kept, so memory grows with the history
+        transaction_ids = set()
+        for path in paths:
+            for transaction in TransactionReader.read(path):
+                transaction_id = transaction.get_transaction_id()
+                if transaction_id in transaction_ids:
+                    continue
+                transaction_ids.add(transaction_id)
+                yield transaction
+
+    @classmethod
+    def read_raw(cls, path: str) -> Iterator[dict]:
+        with TransactionReader._open(path) as stream:
+            for line_number, line in enumerate(stream, start=1):
+                line = line.strip()
+                if len(line) == 0:
+                    continue
+                try:
+                    payload = json.loads(line)
+                except ValueError as e:
+                    logger.error(f"can not decode transaction. {path}:{line_number}")
+                    raise e
+                yield KavaUtil.intern_strings(payload)
+
+    @classmethod
+    @contextlib.contextmanager
+    def _open(cls, path: str) -> Iterator[IO[bytes]]:
+        if path.endswith(GZIP_SUFFIXES):
+            command = shutil.which("pigz") or shutil.which("gzip")
+            if command is not None:
+                with TransactionReader._open_process([command, "-dc", path]) as stream:
+                    yield stream
+            else:
+                with gzip.open(path, "rb") as stream:
+                    yield stream
+        elif path.endswith(ZSTD_SUFFIXES):
+            command = shutil.which("zstd")
+            if command is not None:
+                with TransactionReader._open_process(
+                    [command, "-dcq", "-T0", path]
+                ) as stream:
+                    yield stream
+            else:
+                with TransactionReader._open_zstandard(path) as stream:
+                    yield stream
+        else:
+            with open(path, "rb") as stream:
+                yield stream
+
+    @classmethod
+    @contextlib.contextmanager
+    def _open_process(cls, command: list) -> Iterator[IO[bytes]]:
+        # decompress in a separate process so it runs in parallel with decoding
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 20
+        )
+        assert process.stdout is not None
+        try:
+            yield process.stdout
+        finally:
+            completed = process.poll() is not None or process.stdout.read(1) == b""
+            process.stdout.close()
+            if not completed:
+                process.kill()
+            returncode = process.wait()
+            stderr = process.stderr.read().decode() if process.stderr else ""
+            if process.stderr:
+                process.stderr.close()
+            if completed and returncode != 0:
+                raise OSError(
+                    f"decompression failed. command: {' '.join(command)} stderr: {stderr}"
+                )
+
+    @classmethod
+    @contextlib.contextmanager
+    def _open_zstandard(cls, path: str) -> Iterator[IO[bytes]]:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                f"zstd command or zstandard package is required to read {path}"
+            ) from e
+
+        with open(path, "rb") as compressed:
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                compressed, read_across_frames=True
+            )
+            with io.BufferedReader(reader) as stream:
+                yield stream
@@ -0,0 +1,79 @@
+import collections
+from typing import Iterable, List, Tuple
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.message_factory import MessageFactory
+
+FAILED = "failed"
+UNKNOWN = "unknown"
+ERROR = "error"
+
+
+class TriageReport:
+    def __init__(self):
+        self.transactions = 0
+        # transactions per (chain_id, normalized action)
+        self.actions: collections.Counter = collections.Counter()
+        self.problem_counts: collections.Counter = collections.Counter()
+        # (transaction_id, problem) of transactions that would not convert cleanly
+        self.problems: List[Tuple[str, str]] = []
+
+    def add(self, transaction: KavaTransaction) -> None:
+        self.transactions += 1
+        chain_id = transaction.get_transaction()["header"]["chain_id"]
+        transaction_id = transaction.get_transaction_id()
+        if transaction.get_fail() is not False:
+            self.actions[chain_id, FAILED] += 1
+            self._add_problem(transaction_id, FAILED, "failed")
+            return
+
+        # only the message event is read. the messages themselves are not parsed
+        try:
+            views = MessageFactory.get_message_views(transaction)
+        except Exception as e:
+            self.actions[chain_id, ERROR] += 1
+            self._add_problem(transaction_id, ERROR, f"{type(e).__name__}: {e}")
+            return
+        actions = {}
+        for view in views:
+            try:
+                normalized_action = view.get_normalized_action()
+                if normalized_action is None:
+                    normalized_action = UNKNOWN
+                    self._add_problem(
+                        transaction_id, UNKNOWN, f"unknown action: {view.get_action()}"
+                    )
+            except Exception as e:
+                normalized_action = ERROR
+                self._add_problem(transaction_id, ERROR, f"{type(e).__name__}: {e}")
+            actions[normalized_action] = None
+        for action in actions:
+            self.actions[chain_id, action] += 1
+
+    def write(self, stream) -> None:
+        stream.write("chain_id\taction\ttransactions\n")
+        for (chain_id, action), count in sorted(self.actions.items()):
+            stream.write(f"{chain_id}\t{action}\t{count}\n")
+        stream.write("\n")
+        stream.write(f"transactions: {self.transactions}\n")
+        stream.write(f"failed transactions: {self.problem_counts[FAILED]}\n")
+        stream.write(f"unknown actions: {self.problem_counts[UNKNOWN]}\n")
+        stream.write(f"other errors: {self.problem_counts[ERROR]}\n")
+        if len(self.problems) > 0:
+            stream.write("\ntransaction_id\tproblem\n")
+            for transaction_id, problem in self.problems:
+                stream.write(f"{transaction_id}\t{problem}\n")
+
+    def _add_problem(self, transaction_id: str, kind: str, problem: str) -> None:
+        self.problem_counts[kind] += 1
+        self.problems.append((transaction_id, problem))
+
+    @classmethod
+    def triage(cls, transactions: Iterable[KavaTransaction]) -> "TriageReport":
+        report = TriageReport()
+        for transaction in transactions:
+            if KavaPlugin.can_handle(transaction):
+                report.add(transaction)
+        return report
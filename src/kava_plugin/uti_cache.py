@@ -0,0 +1,25 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from senkalib.token_original_id_table import TokenOriginalIdTable
+
+
+class UtiCache:
+    def __init__(self, token_table: "TokenOriginalIdTable"):
+        self.token_table = token_table
+        self._utis: dict = {}
+
+    def get_uti(self, platform: str, token_original_id: Optional[str]) -> Optional[str]:
+        key = (platform, token_original_id)
+        try:
+            return self._utis[key]
+        except KeyError:
+            uti = self.token_table.get_uti(platform, token_original_id)
+            self._utis[key] = uti
+            return uti
+
+    def __getattr__(self, name: str):
+        # token_table is missing while unpickling
+        if name == "token_table":
+            raise AttributeError(name)
+        return getattr(self.token_table, name)
@@ -1,31 +1,611 @@
+import argparse
+import contextlib
+import csv
+import dataclasses
+import functools
+import os
 import sys
+from typing import Iterable, Iterator, Optional, Tuple
 
-import pandas as pd
-from senkalib.platform.kava.kava_transaction_generator import KavaTransactionGenerator
-from senkalib.senka_setting import SenkaSetting
-from senkalib.token_original_id_table import TokenOriginalIdTable
+from senkalib.platform.kava.kava_transaction import KavaTransaction
 
+from kava_plugin.action_filter import ACTION_FAMILIES, ActionFilter
+from kava_plugin.balance_tracker import (
+    SNAPSHOT_FIELD_NAMES,
+    SNAPSHOT_PERIODS,
+    BalanceTracker,
+)
+from kava_plugin.dead_letter import DeadLetterFile
+from kava_plugin.fee_totals import FeeTotals
+from kava_plugin.height_shard import HeightShard
+from kava_plugin.journal_sorter import FIELD_NAMES, JournalSorter
 from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.kava_util import KavaUtil
+from kava_plugin.metrics import REGISTRY
+from kava_plugin.period_rollup import DEFAULT_GROUP_BY, PERIODS, PeriodRollup
+from kava_plugin.position_tracker import PositionTracker
+from kava_plugin.profiler import DEFAULT_INTERVAL, SamplingProfiler
+from kava_plugin.transaction_reader import TransactionReader
 
 TOKEN_ORIGINAL_IDS_URL = "https://raw.githubusercontent.com/ca3-caaip/token_original_id/master/token_original_id.csv"
+SYNTHETIC_MAX_MESSAGES = 3
 
 
-if __name__ == "__main__":
-    args = sys.argv
-    address = args[1]
-    caajs = []
-    settings = SenkaSetting({})
-    token_original_ids = TokenOriginalIdTable(TOKEN_ORIGINAL_IDS_URL)
+def get_address_transactions(address: str) -> Iterator[KavaTransaction]:
+    from senkalib.platform.kava.kava_transaction_generator import (
+        KavaTransactionGenerator,
+    )
+
     transactions = KavaTransactionGenerator.get_transactions(
         {"type": "address", "data": address}
     )
+    # each raw payload is released as soon as its interned copy is made
+    transactions.reverse()
+    while len(transactions) > 0:
+        payload = transactions.pop().get_transaction()
+        yield KavaTransaction(KavaUtil.intern_strings(payload))
+
+
+def get_transactions(addresses: list) -> list:
+    transactions = {}
+    for address in addresses:
+        for transaction in get_address_transactions(address):
+            transactions.setdefault(transaction.get_transaction_id(), transaction)
+    return list(transactions.values())
+
+
+def get_caajs(
+    addresses: list,
+    transactions: Iterable,
+    token_table,
+    dead_letters=None,
+    action_filter: Optional[ActionFilter] = None,
+) -> Iterator:
+    def on_error(transaction, e: Exception) -> None:
+        dead_letters.append(DeadLetterFile.get_record(transaction, e))
+
+    if len(addresses) == 1:
+        yield from KavaPlugin.get_caajs_many(
+            addresses[0],
+            transactions,
+            token_table,
+            on_error=on_error if dead_letters is not None else None,
+            action_filter=action_filter,
+        )
+        return
 
     for transaction in transactions:
-        if KavaPlugin.can_handle(transaction):
-            caaj_peace = KavaPlugin.get_caajs(address, transaction, token_original_ids)
-            caajs.extend(caaj_peace)
-
-    df = pd.DataFrame(caajs)
-    df = df.sort_values("executed_at")
-    caaj_csv = df.to_csv(None, index=False)
-    print(caaj_csv)
+        if not KavaPlugin.can_handle(transaction):
+            continue
+
+        try:
+            caaj_peaces = KavaPlugin.get_caajs_for_addresses(
+                addresses, transaction, token_table, action_filter=action_filter
+            )
+        except Exception as e:
+            if dead_letters is None:
+                raise e
+            on_error(transaction, e)
+            continue
+
+        for caaj_peace in caaj_peaces.values():
+            yield from caaj_peace
+
+
+def parse_memory_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    value = value.strip().upper().rstrip("B")
+    try:
+        if value[-1:] in units:
+            size = int(float(value[:-1]) * units[value[-1]])
+        else:
+            size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid memory size: {value}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"memory size must be positive: {value}")
+    return size
+
+
+def parse_shard(value: str) -> HeightShard:
+    try:
+        return HeightShard.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_action_filter(value: str) -> ActionFilter:
+    try:
+        return ActionFilter.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_fields(value: str) -> tuple:
+    return tuple(field.strip() for field in value.split(",") if field.strip())
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="convert kava transactions into caaj journals"
+    )
+    parser.add_argument(
+        "addresses",
+        nargs="*",
+        help="kava addresses to track. transactions shared by several addresses are parsed once",
+    )
+    parser.add_argument(
+        "--input",
+        action="append",
+        metavar="PATH",
+        help="read transactions from a .jsonl, .jsonl.gz or .jsonl.zst archive instead of the kava api. can be given several times",
+    )
+    parser.add_argument(
+        "--dedupe-input",
+        action="store_true",
+        help="convert a transaction found in several --input archives once. the id of every transaction read is kept in memory",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_memory_size,
+        metavar="SIZE",
+        help="spill sorted journals to temporary files when they exceed SIZE (e.g. 512M, 2G) and merge them at the end",
+    )
+    parser.add_argument(
+        "--dead-letter",
+        metavar="PATH",
+        help="write transactions that fail to convert to PATH with their error and keep converting",
+    )
+    parser.add_argument(
+        "--replay-dead-letters",
+        metavar="PATH",
+        help="convert only the transactions recorded in a --dead-letter file",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="write conversion metrics in the prometheus text format to PATH when the run ends",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve conversion metrics on http://127.0.0.1:PORT/metrics while running",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="sample the conversion loop and write a flamegraph profile to PATH. .json files are written in the speedscope format, other files as collapsed stacks",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help=f"sampling interval of --profile. defaults to {DEFAULT_INTERVAL}",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="START..END",
+        help="convert only transactions in a block height range such as kava-8:100000..kava-9:2000. either bound may be empty",
+    )
+    parser.add_argument(
+        "--actions",
+        type=parse_action_filter,
+        metavar="FAMILIES",
+        help=f"convert only the comma separated action families. other messages are skipped before they are parsed. families: {', '.join(ACTION_FAMILIES)}",
+    )
+    parser.add_argument(
+        "--balances",
+        metavar="PATH",
+        help="write running balances per address, uti and account (wallet, staking, cdp, hard, pool) to PATH while converting",
+    )
+    parser.add_argument(
+        "--balance-snapshots",
+        choices=sorted(SNAPSHOT_PERIODS),
+        default="transaction",
+        help="write a --balances snapshot after every transaction or day. defaults to transaction",
+    )
+    parser.add_argument(
+        "--positions",
+        metavar="PATH",
+        help="keep open cdp, hard and swap pool positions in the state file PATH. journals already in PATH are not applied again, so a run can continue from the previous one",
+    )
+    parser.add_argument(
+        "--print-positions",
+        metavar="PATH",
+        help="print the open positions in the state file PATH as csv and exit. only the positions of the given addresses are printed when addresses are given",
+    )
+    parser.add_argument(
+        "--fee-totals",
+        choices=list(PERIODS),
+        metavar="PERIOD",
+        help=f"print the fees paid per {', '.join(PERIODS)} instead of journals. messages are not parsed",
+    )
+    parser.add_argument(
+        "--rollup",
+        choices=list(PERIODS),
+        metavar="PERIOD",
+        help=f"print journal totals per {', '.join(PERIODS)} instead of journals",
+    )
+    parser.add_argument(
+        "--rollup-by",
+        type=parse_fields,
+        default=DEFAULT_GROUP_BY,
+        metavar="FIELDS",
+        help=f"comma separated journal fields of the --rollup totals. defaults to {','.join(DEFAULT_GROUP_BY)}",
+    )
+    parser.add_argument(
+        "--rollup-file",
+        metavar="PATH",
+        help="write the --rollup totals to PATH and print the journals as well",
+    )
+    parser.add_argument(
+        "--triage",
+        action="store_true",
+        help="print the transactions per action and chain id, failed transactions and unknown actions without converting and exit",
+    )
+    parser.add_argument(
+        "--plan-shards",
+        type=int,
+        metavar="N",
+        help="print N block height ranges with similar transaction counts and exit",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        metavar="N",
+        help="split the history into N block height ranges and convert them in parallel",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes for --shards, or threads fetching addresses for --serve. defaults to the number of cpus",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        nargs="+",
+        metavar="CSV",
+        help="merge csv outputs of --shard runs into one sorted csv and exit",
+    )
+    parser.add_argument(
+        "--synthesize",
+        type=int,
+        metavar="N",
+        help="print N synthetic transactions of the first address as json lines for --input and exit. requires --templates",
+    )
+    parser.add_argument(
+        "--templates",
+        metavar="DIR",
+        help="directory of transaction json files used as templates by --synthesize, e.g. tests/data of the repository",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="random seed of --synthesize. defaults to 0",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="run as a conversion service on http://127.0.0.1:PORT instead of converting addresses",
+    )
+    parser.add_argument(
+        "--serve-socket",
+        metavar="PATH",
+        help="run as a conversion service on the unix socket PATH instead of converting addresses",
+    )
+    return parser
+
+
+def serve(
+    port: Optional[int], socket_path: Optional[str], workers: Optional[int]
+) -> None:
+    from senkalib.token_original_id_table import TokenOriginalIdTable
+
+    from kava_plugin.conversion_service import ConversionService
+
+    # the token table and the parsed messages stay loaded between requests
+    service = ConversionService(
+        TokenOriginalIdTable(TOKEN_ORIGINAL_IDS_URL),
+        get_address_transactions,
+        workers=workers,
+    )
+    server = service.get_server(port, socket_path=socket_path)
+    print(f"serving on {socket_path or server.server_address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def get_input_transactions(
+    addresses: list, paths: Optional[list], unique: bool = False
+) -> Iterable:
+    return (
+        TransactionReader.read_many(paths, unique)
+        if paths
+        else get_transactions(addresses)
+    )
+
+
+def convert_shard(
+    addresses: list,
+    shard: HeightShard,
+    paths: Optional[list],
+    transactions: Optional[list],
+    token_table,
+    tolerant: bool,
+    action_filter: Optional[ActionFilter] = None,
+    unique: bool = False,
+) -> Tuple[list, list, dict]:
+    # metrics of a worker process are sent back to the parent with the journals
+    REGISTRY.reset()
+    if transactions is None:
+        transactions = TransactionReader.read_many(paths or [], unique)
+    shard_transactions = filter(shard.contains, transactions)
+    dead_letters: Optional[list] = [] if tolerant else None
+    caajs = list(
+        get_caajs(
+            addresses, shard_transactions, token_table, dead_letters, action_filter
+        )
+    )
+    return caajs, dead_letters or [], REGISTRY.snapshot()
+
+
+def get_sharded_caajs(
+    addresses: list,
+    paths: Optional[list],
+    count: int,
+    workers: int,
+    token_table,
+    dead_letters=None,
+    action_filter: Optional[ActionFilter] = None,
+    unique: bool = False,
+) -> Iterator:
+    transactions = get_input_transactions(addresses, paths, unique)
+    if not paths:
+        transactions = list(transactions)
+    shards = HeightShard.plan(transactions, count)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for shard in shards:
+            # archives are re-read by each worker instead of being pickled
+            shard_transactions = (
+                None if paths else [t for t in transactions if shard.contains(t)]
+            )
+            futures.append(
+                executor.submit(
+                    convert_shard,
+                    addresses,
+                    shard,
+                    paths,
+                    shard_transactions,
+                    token_table,
+                    dead_letters is not None,
+                    action_filter,
+                    unique,
+                )
+            )
+        for future in futures:
+            caajs, shard_dead_letters, metrics = future.result()
+            REGISTRY.merge(metrics)
+            for record in shard_dead_letters:
+                dead_letters.append(record)
+            yield from caajs
+
+
+def write_caajs(caajs: Iterable, max_memory: Optional[int]) -> None:
+    if max_memory is None:
+        # pandas is only needed here and dominates the start-up time
+        import pandas as pd
+
+        df = pd.DataFrame(list(caajs), columns=FIELD_NAMES)
+        df = df.sort_values("executed_at", kind="stable")
+        caaj_csv = df.to_csv(None, index=False)
+        print(caaj_csv)
+    else:
+        with JournalSorter(max_memory) as sorter:
+            sorter.extend(caajs)
+            sorter.write_csv(sys.stdout)
+        print()
+
+
+def get_sorted_caajs(caajs: Iterable, sorter: JournalSorter) -> Iterator:
+    sorter.extend(caajs)
+    yield from sorter.get_caajs()
+
+
+def get_balance_tracker(stream, period: str) -> BalanceTracker:
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(SNAPSHOT_FIELD_NAMES)
+    return BalanceTracker(
+        lambda snapshot: writer.writerow(dataclasses.astuple(snapshot)), period
+    )
+
+
+def write_rollup(caajs: Iterable, rollup: PeriodRollup) -> None:
+    rollup.extend(caajs)
+    rollup.write_csv(sys.stdout)
+
+
+def main() -> None:
+    parser = get_parser()
+    args = parser.parse_args()
+    if args.merge_shards:
+        JournalSorter.merge_csv(args.merge_shards, sys.stdout)
+        print()
+        return
+    if args.print_positions:
+        positions = PositionTracker.load(args.print_positions)
+        positions.write_csv(sys.stdout, args.addresses or None)
+        return
+    if args.serve is not None or args.serve_socket:
+        serve(args.serve, args.serve_socket, args.workers)
+        return
+    if len(args.addresses) == 0:
+        parser.error("the following arguments are required: addresses")
+    if args.profile and args.shards is not None:
+        parser.error(
+            "--profile samples this process only and can not be used with --shards"
+        )
+    if args.fee_totals is not None:
+        if args.actions is not None:
+            parser.error("--fee-totals can not be used with --actions")
+        args.actions = ActionFilter.parse("fees")
+    if (
+        args.dead_letter
+        and args.replay_dead_letters
+        and os.path.realpath(args.dead_letter)
+        == os.path.realpath(args.replay_dead_letters)
+    ):
+        # records appended during the replay would be read again by the replay
+        parser.error("--dead-letter and --replay-dead-letters must be different files")
+    if args.synthesize is not None and not args.templates:
+        parser.error("--synthesize requires --templates")
+    if args.rollup_file and args.rollup is None:
+        parser.error("--rollup-file requires --rollup")
+    rollup = None
+    if args.rollup is not None:
+        if args.fee_totals is not None:
+            parser.error("--rollup can not be used with --fee-totals")
+        try:
+            rollup = PeriodRollup(args.rollup, args.rollup_by)
+        except ValueError as e:
+            parser.error(str(e))
+
+    addresses = list(dict.fromkeys(args.addresses))
+    if args.synthesize is not None:
+        from kava_plugin.synthetic_history import SyntheticHistory
+
+        history = SyntheticHistory.from_directory(
+            args.templates,
+            address=addresses[0],
+            seed=args.seed,
+            max_messages=SYNTHETIC_MAX_MESSAGES,
+        )
+        history.write(sys.stdout, args.synthesize)
+        return
+    if args.triage:
+        from kava_plugin.triage import TriageReport
+
+        transactions = get_input_transactions(addresses, args.input, args.dedupe_input)
+        if args.shard is not None:
+            transactions = filter(args.shard.contains, transactions)
+        TriageReport.triage(transactions).write(sys.stdout)
+        return
+    if args.plan_shards is not None:
+        transactions = get_input_transactions(addresses, args.input, args.dedupe_input)
+        for shard in HeightShard.plan(transactions, args.plan_shards):
+            print(shard)
+        return
+
+    if args.metrics_port is not None:
+        REGISTRY.serve(args.metrics_port)
+
+    from senkalib.token_original_id_table import TokenOriginalIdTable
+
+    # fee journals have a fixed uti and do not need the token table
+    token_original_ids = (
+        TokenOriginalIdTable(TOKEN_ORIGINAL_IDS_URL)
+        if args.actions is None or args.actions.includes_messages()
+        else None
+    )
+    if args.fee_totals is not None:
+        write = functools.partial(write_rollup, rollup=FeeTotals(args.fee_totals))
+    elif rollup is not None and not args.rollup_file:
+        write = functools.partial(write_rollup, rollup=rollup)
+    else:
+        write = functools.partial(write_caajs, max_memory=args.max_memory)
+    with contextlib.ExitStack() as stack:
+        dead_letters = (
+            stack.enter_context(DeadLetterFile(args.dead_letter))
+            if args.dead_letter
+            else None
+        )
+        if args.replay_dead_letters:
+            transactions = DeadLetterFile.read(args.replay_dead_letters)
+            caajs = get_caajs(
+                addresses,
+                transactions,
+                token_original_ids,
+                dead_letters,
+                args.actions,
+            )
+        elif args.shards is not None:
+            caajs = get_sharded_caajs(
+                addresses,
+                args.input,
+                args.shards,
+                args.workers,
+                token_original_ids,
+                dead_letters,
+                args.actions,
+                args.dedupe_input,
+            )
+        else:
+            transactions = get_input_transactions(
+                addresses, args.input, args.dedupe_input
+            )
+            if args.shard is not None:
+                transactions = filter(args.shard.contains, transactions)
+            caajs = get_caajs(
+                addresses,
+                transactions,
+                token_original_ids,
+                dead_letters,
+                args.actions,
+            )
+
+        if args.balances:
+            # sources return the history newest first or interleave days, and
+            # running balances need the journals in time order
+            sorter = stack.enter_context(
+                JournalSorter(args.max_memory, ("executed_at", "transaction_id"))
+            )
+            caajs = get_sorted_caajs(caajs, sorter)
+            balances = stack.enter_context(
+                open(args.balances, "w", newline="", encoding="utf-8")
+            )
+            tracker = get_balance_tracker(balances, args.balance_snapshots)
+            caajs = tracker.track(caajs)
+        if args.positions:
+            positions = PositionTracker.load(args.positions)
+            caajs = positions.track(caajs)
+        if rollup is not None and args.rollup_file:
+            caajs = rollup.track(caajs)
+
+        if args.profile:
+            with SamplingProfiler(args.profile_interval) as profiler:
+                write(caajs)
+            profiler.write(args.profile)
+        else:
+            write(caajs)
+
+        if args.positions:
+            positions.save(args.positions)
+        if rollup is not None and args.rollup_file:
+            with open(args.rollup_file, "w", newline="", encoding="utf-8") as f:
+                rollup.write_csv(f)
+
+        if args.metrics_file:
+            REGISTRY.write(args.metrics_file)
+
+        if dead_letters is not None and dead_letters.count > 0:
+            print(
+                f"{dead_letters.count} transactions could not be converted. see {args.dead_letter}",
+                file=sys.stderr,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import collections
+import dataclasses
+import glob
+import json
+import unittest
+from unittest.mock import patch
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.action_filter import ACTION_FAMILIES, ActionFilter
+from kava_plugin.kava_plugin import KavaPlugin, UnknownActionError
+from kava_plugin.message_cache import MessageCache
+from kava_plugin.message_factory import MessageView
+from kava_plugin.synthetic_history import ADDRESS_PATTERN
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str) -> str:
+        return f"{token_original_id}/{platform}"
+
+
+class TestActionFilter(unittest.TestCase):
+    @classmethod
+    def get_transactions(cls) -> list:
+        transactions = []
+        for path in sorted(glob.glob("tests/data/*.json")):
+            with open(path, encoding="utf-8") as jsonfile_local:
+                text = jsonfile_local.read()
+            # the most frequent address is the owner of the transaction
+            counts = collections.Counter(ADDRESS_PATTERN.findall(text))
+            address = counts.most_common(1)[0][0]
+            transactions.append((address, KavaTransaction(json.loads(text))))
+        return transactions
+
+    def test_parse(self):
+        action_filter = ActionFilter.parse("staking, fees,staking")
+        self.assertEqual(action_filter.families, frozenset({"staking", "fees"}))
+        self.assertEqual(str(action_filter), "staking,fees")
+        self.assertTrue(action_filter.includes("delegate"))
+        self.assertFalse(action_filter.includes("send"))
+        self.assertFalse(action_filter.includes(None))
+        self.assertTrue(action_filter.includes_fees())
+        self.assertFalse(ActionFilter.parse("cdp").includes_fees())
+
+        for spec in ["", " , ", "staking,taxes"]:
+            with self.assertRaises(ValueError):
+                ActionFilter.parse(spec)
+
+    def test_families_partition_the_journals(self):
+        table = TokenTable()
+        for address, transaction in TestActionFilter.get_transactions():
+            expected = KavaPlugin.get_caajs(address, transaction, table)
+            caajs = KavaPlugin.get_caajs(
+                address,
+                transaction,
+                table,
+                action_filter=ActionFilter(frozenset(ACTION_FAMILIES)),
+            )
+            self.assertEqual(
+                [dataclasses.replace(caaj, trade_uuid="") for caaj in caajs],
+                [dataclasses.replace(caaj, trade_uuid="") for caaj in expected],
+            )
+
+            counts = [
+                len(
+                    KavaPlugin.get_caajs(
+                        address,
+                        transaction,
+                        table,
+                        action_filter=ActionFilter(frozenset({family})),
+                    )
+                )
+                for family in ACTION_FAMILIES
+            ]
+            self.assertEqual(sum(counts), len(expected))
+
+    def test_filtered_messages_are_not_parsed(self):
+        address = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+        with open("tests/data/send_v8.json", encoding="utf-8") as jsonfile_local:
+            transaction = KavaTransaction(json.load(jsonfile_local))
+        message_cache = MessageCache()
+
+        with patch.object(
+            MessageView, "get_message", side_effect=AssertionError
+        ) as get_message:
+            caajs = KavaPlugin.get_caajs(
+                address,
+                transaction,
+                TokenTable(),
+                message_cache,
+                ActionFilter.parse("fees"),
+            )
+        get_message.assert_not_called()
+        self.assertEqual([caaj.caaj_to for caaj in caajs], ["fee"])
+
+        # partial results are not cached for unfiltered conversions
+        caajs = KavaPlugin.get_caajs(address, transaction, TokenTable(), message_cache)
+        self.assertEqual([caaj.type for caaj in caajs], ["send", "lose"])
+        caajs = KavaPlugin.get_caajs(
+            address,
+            transaction,
+            TokenTable(),
+            message_cache,
+            ActionFilter.parse("transfers"),
+        )
+        self.assertEqual([caaj.type for caaj in caajs], ["send"])
+
+    def test_unknown_actions_are_not_filtered(self):
+        address = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+        with open("tests/data/send_v8.json", encoding="utf-8") as jsonfile_local:
+            payload = json.load(jsonfile_local)
+        for event in payload["data"]["logs"][0]["events"]:
+            for attribute in event["attributes"]:
+                if attribute["key"] == "action":
+                    attribute["value"] = "unknown_action"
+        transaction = KavaTransaction(payload)
+
+        for spec in ["staking", "fees"]:
+            with self.assertRaises(UnknownActionError):
+                KavaPlugin.get_caajs(
+                    address, transaction, TokenTable(), None, ActionFilter.parse(spec)
+                )
+            errors = []
+            caajs = list(
+                KavaPlugin.get_caajs_many(
+                    address,
+                    [transaction],
+                    TokenTable(),
+                    on_error=lambda transaction, e: errors.append(e),
+                    action_filter=ActionFilter.parse(spec),
+                )
+            )
+            self.assertEqual(caajs, [])
+            self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
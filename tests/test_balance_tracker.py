@@ -0,0 +1,144 @@
+import unittest
+from decimal import Decimal
+
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.balance_tracker import BalanceTracker
+
+ADDRESS = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+OTHER = "kava1ys70jvnajkv88529ys6urjcyle3k2j9r24g6a7"
+
+
+def get_caaj(executed_at, transaction_id, caaj_type, amount, uti, caaj_from, caaj_to):
+    return CaajJournal(
+        executed_at,
+        "kava",
+        "kava",
+        "test",
+        transaction_id,
+        "trade",
+        caaj_type,
+        amount,
+        uti,
+        caaj_from,
+        caaj_to,
+        "",
+    )
+
+
+CAAJS = [
+    get_caaj("2022-01-01 00:00:00", "A", "receive", "100", "kava/kava", OTHER, ADDRESS),
+    get_caaj(
+        "2022-01-01 01:00:00",
+        "B",
+        "deposit",
+        "60",
+        "kava/kava",
+        ADDRESS,
+        "kava_validator",
+    ),
+    get_caaj(
+        "2022-01-01 01:00:00",
+        "B",
+        "get",
+        "0.5",
+        "kava/kava",
+        "kava_staking_reward",
+        ADDRESS,
+    ),
+    get_caaj("2022-01-01 01:00:00", "B", "lose", "0.001", "kava/kava", ADDRESS, "fee"),
+    get_caaj(
+        "2022-01-02 00:00:00", "C", "deposit", "10", "bnb/kava", ADDRESS, "kava_cdp"
+    ),
+    # draw_cdp journals are recorded from the address to the cdp
+    get_caaj(
+        "2022-01-02 00:00:00", "C", "borrow", "5", "usdx/kava", ADDRESS, "kava_cdp"
+    ),
+    get_caaj(
+        "2022-01-02 00:00:00",
+        "C",
+        "get_bonds",
+        "7",
+        "bnb:usdx/kava",
+        "kava_swap",
+        ADDRESS,
+    ),
+    get_caaj(
+        "2022-01-02 12:00:00",
+        "D",
+        "withdraw",
+        "20",
+        "kava/kava",
+        "kava_validator",
+        ADDRESS,
+    ),
+    get_caaj("2022-01-02 12:00:00", "D", "send", "1", "kava/kava", ADDRESS, OTHER),
+]
+
+
+class TestBalanceTracker(unittest.TestCase):
+    def test_balances(self):
+        snapshots = []
+        tracker = BalanceTracker(snapshots.append)
+        self.assertEqual(list(tracker.track(CAAJS)), CAAJS)
+
+        self.assertEqual(tracker.get_balance(ADDRESS, "kava/kava"), Decimal("59.499"))
+        self.assertEqual(
+            tracker.get_balance(ADDRESS, "kava/kava", "staking"), Decimal("40")
+        )
+        self.assertEqual(tracker.get_balance(ADDRESS, "bnb/kava"), Decimal("-10"))
+        self.assertEqual(tracker.get_balance(ADDRESS, "bnb/kava", "cdp"), Decimal("10"))
+        self.assertEqual(tracker.get_balance(ADDRESS, "usdx/kava"), Decimal("5"))
+        self.assertEqual(
+            tracker.get_balance(ADDRESS, "usdx/kava", "cdp"), Decimal("-5")
+        )
+        self.assertEqual(
+            tracker.get_balance(ADDRESS, "bnb:usdx/kava", "pool"), Decimal("7")
+        )
+        self.assertEqual(tracker.get_balance(OTHER, "kava/kava"), Decimal("0"))
+
+        self.assertEqual(
+            [snapshot.transaction_id for snapshot in snapshots],
+            ["A", "B", "B", "C", "C", "C", "C", "C", "D", "D"],
+        )
+        self.assertEqual(
+            (snapshots[1].account, snapshots[1].balance), ("wallet", "40.499")
+        )
+        self.assertEqual(snapshots[-1].executed_at, "2022-01-02 12:00:00")
+
+    def test_daily_snapshots(self):
+        snapshots = []
+        tracker = BalanceTracker(snapshots.append, "day")
+        list(tracker.track(CAAJS))
+
+        self.assertEqual(
+            [
+                (snapshot.executed_at, snapshot.uti, snapshot.account, snapshot.balance)
+                for snapshot in snapshots[:2]
+            ],
+            [
+                ("2022-01-01", "kava/kava", "wallet", "40.499"),
+                ("2022-01-01", "kava/kava", "staking", "60"),
+            ],
+        )
+        self.assertEqual(len(snapshots), 9)
+        self.assertEqual(snapshots[-1].transaction_id, "D")
+
+    def test_unsorted_journals(self):
+        tracker = BalanceTracker(lambda snapshot: None)
+        with self.assertRaises(ValueError):
+            list(tracker.track([CAAJS[4], CAAJS[0]]))
+
+    def test_unknown_type(self):
+        tracker = BalanceTracker(lambda snapshot: None)
+        caaj = get_caaj(
+            "2022-01-01 00:00:00", "A", "burn", "1", "kava/kava", ADDRESS, "x"
+        )
+        with self.assertRaises(ValueError):
+            tracker.add(caaj)
+        with self.assertRaises(ValueError):
+            BalanceTracker(lambda snapshot: None, "week")
+
+
+if __name__ == "__main__":
+    unittest.main()
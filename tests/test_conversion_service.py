@@ -0,0 +1,166 @@
+import http.client
+import json
+import os
+import socket
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.conversion_service import ConversionRequestError, ConversionService
+from kava_plugin.kava_plugin import KavaPlugin
+
+ADDRESS = "kava1cj7njkw2g9fqx4e768zc75dp9sks8u9znxrf0w"
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestConversionService(unittest.TestCase):
+    def setUp(self):
+        self.token_table = MagicMock()
+        self.token_table.get_uti.side_effect = (
+            lambda platform, token: f"{token}/{platform}"
+        )
+        self.payload = TestConversionService._get_test_data("claim_hard_reward_v7")
+
+    def test_convert(self):
+        service = ConversionService(self.token_table)
+        try:
+            response = service.convert(
+                {"addresses": [ADDRESS], "transactions": [self.payload]}
+            )
+            response = service.convert(
+                {"addresses": [ADDRESS], "transactions": [self.payload]}
+            )
+        finally:
+            service.close()
+
+        expected = KavaPlugin.get_caajs(
+            ADDRESS, KavaTransaction(self.payload), self.token_table
+        )
+        self.assertEqual(
+            [(caaj["type"], caaj["amount"], caaj["uti"]) for caaj in response["caajs"]],
+            [(caaj.type, caaj.amount, caaj.uti) for caaj in expected],
+        )
+        self.assertEqual(response["dead_letters"], [])
+        # payloads of a request are not trusted and not cached
+        self.assertEqual(service.message_cache.get_stats()["size"], 0)
+
+        for request in [
+            {"addresses": []},
+            {"addresses": [ADDRESS]},
+            {"addresses": [ADDRESS], "transactions": [[]]},
+            {"addresses": [ADDRESS], "transactions": [{"header": {}}]},
+            {"addresses": [ADDRESS], "transactions": [], "dead_letters": "yes"},
+        ]:
+            with self.assertRaises(ConversionRequestError):
+                service.convert(request)
+
+    def test_fetch_transactions(self):
+        get_transactions = MagicMock(return_value=[KavaTransaction(self.payload)])
+        service = ConversionService(self.token_table, get_transactions)
+        try:
+            response = service.convert({"addresses": [ADDRESS, "kava1other"]})
+        finally:
+            service.close()
+
+        self.assertEqual(get_transactions.call_count, 2)
+        self.assertGreater(len(response["caajs"]), 0)
+        self.assertTrue(all(caaj["trade_uuid"] for caaj in response["caajs"]))
+        self.assertEqual(service.message_cache.get_stats()["size"], 1)
+
+    def test_dead_letters(self):
+        for event in self.payload["data"]["logs"][0]["events"]:
+            if event["type"] == "message":
+                for attribute in event["attributes"]:
+                    if attribute["key"] == "action":
+                        attribute["value"] = "unknown_action"
+        service = ConversionService(self.token_table)
+        try:
+            response = service.convert(
+                {
+                    "addresses": [ADDRESS],
+                    "transactions": [self.payload],
+                    "dead_letters": True,
+                }
+            )
+        finally:
+            service.close()
+
+        self.assertEqual(response["caajs"], [])
+        self.assertEqual(len(response["dead_letters"]), 1)
+        self.assertIn("UnknownActionError", response["dead_letters"][0]["error"])
+
+        with self.assertRaises(ConversionRequestError):
+            service.convert({"addresses": [ADDRESS], "transactions": [self.payload]})
+
+    def test_serve_http(self):
+        service = ConversionService(self.token_table)
+        server = service.serve(0)
+        try:
+            connection = http.client.HTTPConnection(*server.server_address)
+            self._assert_requests(connection)
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+    def test_serve_unix_socket(self):
+        service = ConversionService(self.token_table)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kava_plugin.sock")
+            server = service.serve(socket_path=path)
+            try:
+                self._assert_requests(UnixHTTPConnection(path))
+            finally:
+                server.shutdown()
+                server.server_close()
+                service.close()
+            self.assertFalse(os.path.exists(path))
+
+    def _assert_requests(self, connection: http.client.HTTPConnection):
+        body = json.dumps({"addresses": [ADDRESS], "transactions": [self.payload]})
+        connection.request("POST", "/caajs", body)
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertGreater(len(json.loads(response.read())["caajs"]), 0)
+
+        for body in [
+            "[]",
+            json.dumps({"addresses": [ADDRESS], "transactions": ["payload"]}),
+            json.dumps({"addresses": [ADDRESS], "transactions": [{"data": 1}]}),
+        ]:
+            connection.request("POST", "/caajs", body)
+            response = connection.getresponse()
+            self.assertEqual(response.status, 400)
+            response.read()
+
+        connection.request("GET", "/status")
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.read())["message_cache"]["size"], 0)
+
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertIn("kava_plugin_transactions_total", response.read().decode())
+        connection.close()
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.dead_letter import DeadLetterFile
+from kava_plugin.kava_plugin import KavaPlugin, UnknownActionError
+
+
+class TestDeadLetterFile(unittest.TestCase):
+    def test_write_and_read(self):
+        unknown = TestDeadLetterFile._get_test_data("send_v8")
+        unknown["data"]["logs"][0]["events"][0]["attributes"][0]["value"] = "unknown"
+        no_logs = TestDeadLetterFile._get_test_data("delegate_v8")
+        del no_logs["data"]["logs"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dead_letters.jsonl")
+            with DeadLetterFile(path) as dead_letters:
+                for payload in [unknown, no_logs]:
+                    transaction = KavaTransaction(payload)
+                    try:
+                        KavaPlugin.get_caajs(
+                            "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea",
+                            transaction,
+                            MagicMock(),
+                        )
+                    except Exception as e:
+                        dead_letters.write(transaction, e)
+                self.assertEqual(dead_letters.count, 2)
+
+            with open(path, encoding="utf-8") as dead_letter_file:
+                records = [json.loads(line) for line in dead_letter_file]
+            replayed = list(DeadLetterFile.read(path))
+
+        self.assertTrue(records[0]["error"].startswith("UnknownActionError: "))
+        self.assertEqual(records[0]["chain_id"], "kava-8")
+        self.assertEqual(records[1]["error"], "KeyError: 'logs'")
+        self.assertIn("Traceback", records[1]["traceback"])
+        self.assertEqual(
+            [transaction.get_transaction() for transaction in replayed],
+            [unknown, no_logs],
+        )
+
+    def test_unknown_action_error(self):
+        payload = TestDeadLetterFile._get_test_data("send_v8")
+        payload["data"]["logs"][0]["events"][0]["attributes"][0]["value"] = "unknown"
+        with self.assertRaises(UnknownActionError):
+            KavaPlugin.get_caajs(
+                "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea",
+                KavaTransaction(payload),
+                MagicMock(),
+            )
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import dataclasses
+import json
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from senkalib.caaj_journal import CaajJournal
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.conversion_service import ConversionService
+from kava_plugin.differential import DifferentialHarness
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.message_cache import MessageCache
+from kava_plugin.synthetic_history import SyntheticHistory
+
+ADDRESS = "kava1af7lm2qv9zp526gjd3cdxrpr9zeangjlyhjqjx"
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str) -> str:
+        return f"{token_original_id}/{platform}"
+
+
+def get_batch_caajs(address, transactions, token_table):
+    return KavaPlugin.get_caajs_many(address, transactions, token_table)
+
+
+def get_parallel_caajs(address, transactions, token_table):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield from KavaPlugin.get_caajs_many(
+            address, transactions, token_table, executor=executor, chunk_size=7
+        )
+
+
+def get_process_caajs(address, transactions, token_table):
+    with ProcessPoolExecutor(
+        max_workers=2, initializer=KavaPlugin.init_worker, initargs=(token_table,)
+    ) as executor:
+        yield from KavaPlugin.get_caajs_many(
+            address,
+            transactions,
+            token_table,
+            executor=executor,
+            chunk_size=7,
+            worker_processes=True,
+        )
+
+
+def get_cached_caajs(address, transactions, token_table):
+    message_cache = MessageCache()
+    list(KavaPlugin.get_caajs_many(address, transactions, token_table, message_cache))
+    return KavaPlugin.get_caajs_many(address, transactions, token_table, message_cache)
+
+
+def get_multi_address_caajs(address, transactions, token_table):
+    for transaction in transactions:
+        if not KavaPlugin.can_handle(transaction):
+            continue
+        caajs = KavaPlugin.get_caajs_for_addresses(
+            [address, "kava1other"], transaction, token_table
+        )
+        yield from caajs.get(address, [])
+
+
+def get_service_caajs(address, transactions, token_table):
+    service = ConversionService(token_table)
+    try:
+        response = service.convert(
+            {
+                "addresses": [address],
+                "transactions": [t.get_transaction() for t in transactions],
+            }
+        )
+    finally:
+        service.close()
+    return [CaajJournal(**caaj) for caaj in response["caajs"]]
+
+
+CANDIDATES = [
+    get_batch_caajs,
+    get_parallel_caajs,
+    get_process_caajs,
+    get_cached_caajs,
+    get_service_caajs,
+]
+
+
+class TestDifferential(unittest.TestCase):
+    def test_fixture_corpus(self):
+        transactions = []
+        for filename in sorted(os.listdir("tests/data")):
+            with open(f"tests/data/{filename}", encoding="utf-8") as jsonfile_local:
+                transactions.append(KavaTransaction(json.load(jsonfile_local)))
+        for candidate in CANDIDATES:
+            with self.subTest(candidate=candidate.__name__):
+                divergence = DifferentialHarness.check(
+                    ADDRESS, transactions, TokenTable(), candidate
+                )
+                self.assertIsNone(divergence, str(divergence))
+
+    def test_synthetic_stream(self):
+        history = SyntheticHistory.from_directory(
+            "tests/data", address=ADDRESS, max_messages=3
+        )
+        transactions = list(history.get_transactions(1000))
+        # every synthetic transaction involves the address, so the multi address
+        # path that skips uninvolved transactions has to match as well
+        for candidate in CANDIDATES + [get_multi_address_caajs]:
+            with self.subTest(candidate=candidate.__name__):
+                divergence = DifferentialHarness.check(
+                    ADDRESS, transactions, TokenTable(), candidate
+                )
+                self.assertIsNone(divergence, str(divergence))
+
+    def test_divergence(self):
+        history = SyntheticHistory.from_directory("tests/data", address=ADDRESS)
+        transactions = list(history.get_transactions(100))
+        reference = list(
+            DifferentialHarness.get_reference_caajs(ADDRESS, transactions, TokenTable())
+        )
+        target = reference[len(reference) // 2]
+        index = [
+            caaj for caaj in reference if caaj.transaction_id == target.transaction_id
+        ].index(target)
+
+        def get_wrong_amount(address, transactions, token_table):
+            for caaj in reference:
+                if caaj is target:
+                    caaj = dataclasses.replace(caaj, amount=caaj.amount + "1")
+                yield caaj
+
+        divergence = DifferentialHarness.check(
+            ADDRESS, transactions, TokenTable(), get_wrong_amount
+        )
+        self.assertEqual(divergence.transaction_id, target.transaction_id)
+        self.assertEqual(divergence.index, index)
+        self.assertEqual(divergence.field, "amount")
+        self.assertEqual(divergence.candidate, target.amount + "1")
+
+        def get_missing_journal(address, transactions, token_table):
+            return [caaj for caaj in reference if caaj is not target]
+
+        divergence = DifferentialHarness.check(
+            ADDRESS, transactions, TokenTable(), get_missing_journal
+        )
+        self.assertEqual(divergence.transaction_id, target.transaction_id)
+        self.assertIsNone(divergence.index)
+
+
+if __name__ == "__main__":
+    unittest.main()
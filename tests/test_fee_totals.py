@@ -0,0 +1,102 @@
+import dataclasses
+import glob
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.action_filter import ActionFilter
+from kava_plugin.fee_totals import FeeTotals
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.message_factory import MessageView
+
+ADDRESS = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+OTHER = "kava1ys70jvnajkv88529ys6urjcyle3k2j9r24g6a7"
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str) -> str:
+        return f"{token_original_id}/{platform}"
+
+
+class TestFeeTotals(unittest.TestCase):
+    @classmethod
+    def get_transactions(cls) -> list:
+        transactions = []
+        for path in sorted(glob.glob("tests/data/*.json")):
+            with open(path, encoding="utf-8") as jsonfile_local:
+                transactions.append(KavaTransaction(json.load(jsonfile_local)))
+        return transactions
+
+    def test_fee_only_conversion(self):
+        transactions = TestFeeTotals.get_transactions()
+        expected = [
+            caaj
+            for caaj in KavaPlugin.get_caajs_many(ADDRESS, transactions, TokenTable())
+            if caaj.caaj_to == "fee"
+        ]
+
+        with patch.object(
+            MessageView, "get_message", side_effect=AssertionError
+        ) as get_message:
+            caajs = list(
+                KavaPlugin.get_caajs_many(
+                    ADDRESS,
+                    transactions,
+                    None,
+                    action_filter=ActionFilter.parse("fees"),
+                )
+            )
+        get_message.assert_not_called()
+        self.assertEqual(
+            [(caaj.transaction_id, caaj.amount, caaj.uti) for caaj in caajs],
+            [(caaj.transaction_id, caaj.amount, caaj.uti) for caaj in expected],
+        )
+
+    def test_fee_totals(self):
+        caajs = KavaPlugin.get_caajs_many(
+            ADDRESS,
+            TestFeeTotals.get_transactions(),
+            TokenTable(),
+            action_filter=ActionFilter.parse("transfers,fees"),
+        )
+        fee_totals = FeeTotals("year")
+        fee_totals.extend(caajs)
+        self.assertEqual(
+            fee_totals.get_rows(),
+            [["2021", "kava/kava", "0.05985", 12], ["2022", "kava/kava", "0.001", 1]],
+        )
+
+        stream = io.StringIO()
+        fee_totals.write_csv(stream)
+        self.assertEqual(
+            stream.getvalue().splitlines()[:2],
+            ["period,uti,amount,transactions", "2021,kava/kava,0.05985,12"],
+        )
+
+        with self.assertRaises(ValueError):
+            FeeTotals("week")
+
+    def test_several_addresses(self):
+        caajs = list(
+            KavaPlugin.get_caajs_many(
+                ADDRESS,
+                TestFeeTotals.get_transactions(),
+                None,
+                action_filter=ActionFilter.parse("fees"),
+            )
+        )
+        # the fee journals of the other involved addresses
+        others = [dataclasses.replace(caaj, caaj_from=OTHER) for caaj in caajs]
+        fee_totals = FeeTotals("year")
+        fee_totals.extend([*caajs, *others])
+        self.assertEqual(
+            fee_totals.get_rows(),
+            [["2021", "kava/kava", "0.05985", 12], ["2022", "kava/kava", "0.001", 1]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
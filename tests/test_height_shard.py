@@ -0,0 +1,83 @@
+import glob
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.height_shard import HeightShard
+from kava_plugin.journal_sorter import FIELD_NAMES, JournalSorter
+
+
+class TestHeightShard(unittest.TestCase):
+    @classmethod
+    def get_transactions(cls) -> list:
+        transactions = []
+        for path in sorted(glob.glob("tests/data/*.json")):
+            with open(path, encoding="utf-8") as jsonfile_local:
+                transactions.append(KavaTransaction(json.load(jsonfile_local)))
+        return transactions
+
+    def test_parse(self):
+        shard = HeightShard.parse("kava-8:100..kava-9:200")
+        self.assertEqual(shard, HeightShard((8, 100), (9, 200)))
+        self.assertEqual(str(shard), "kava-8:100..kava-9:200")
+        self.assertEqual(HeightShard.parse("..kava-8:100"), HeightShard(None, (8, 100)))
+        self.assertEqual(HeightShard.parse("kava_2222-10:5.."), HeightShard((10, 5)))
+
+        for spec in ["kava-8:100", "kava-8..", "kava-8:abc.."]:
+            with self.assertRaises(ValueError):
+                HeightShard.parse(spec)
+
+    def test_contains(self):
+        transactions = TestHeightShard.get_transactions()
+        shard = HeightShard.parse("kava-8:1391..kava-8:122487")
+        heights = [
+            HeightShard.get_key(transaction)
+            for transaction in transactions
+            if shard.contains(transaction)
+        ]
+        self.assertIn((8, 1391), heights)
+        self.assertNotIn((8, 122487), heights)
+        self.assertTrue(all((8, 1391) <= key < (8, 122487) for key in heights))
+
+    def test_plan(self):
+        transactions = TestHeightShard.get_transactions()
+        shards = HeightShard.plan(transactions, 4)
+
+        self.assertEqual(len(shards), 4)
+        self.assertIsNone(shards[0].start)
+        self.assertIsNone(shards[-1].end)
+        for shard, next_shard in zip(shards, shards[1:]):
+            self.assertEqual(shard.end, next_shard.start)
+        for transaction in transactions:
+            self.assertEqual(sum(shard.contains(transaction) for shard in shards), 1)
+
+        self.assertEqual(HeightShard.plan([], 3), [HeightShard()])
+        with self.assertRaises(ValueError):
+            HeightShard.plan(transactions, 0)
+
+    def test_merge_csv(self):
+        header = ",".join(FIELD_NAMES)
+        row = "{},kava,kava,send,TX{},uuid,send,1,kava/kava,from,to,"
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for i, times in enumerate([["01", "03"], ["02", "04"]]):
+                path = os.path.join(directory, f"part{i}.csv")
+                with open(path, "w", encoding="utf-8") as csvfile:
+                    lines = [row.format(f"2021-10-{day} 00:00:00", i) for day in times]
+                    csvfile.write("\n".join([header, *lines]) + "\n\n")
+                paths.append(path)
+
+            merged = io.StringIO()
+            JournalSorter.merge_csv(paths, merged)
+
+        lines = merged.getvalue().splitlines()
+        self.assertEqual(lines[0], header)
+        self.assertEqual([line[8:10] for line in lines[1:]], ["01", "02", "03", "04"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import os
+import unittest
+
+import pandas as pd
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.journal_sorter import JournalSorter
+
+
+class TestJournalSorter(unittest.TestCase):
+    @classmethod
+    def get_caajs(cls, count: int) -> list:
+        caajs = []
+        for i in range(count):
+            caajs.append(
+                CaajJournal(
+                    f"2021-10-{(i * 7) % 28 + 1:02} 01:57:03",
+                    "kava",
+                    "kava",
+                    "send",
+                    f"TX{i}",
+                    f"uuid-{i}",
+                    "send",
+                    str(i),
+                    "kava/kava" if i % 3 else None,
+                    "kava1jv65s3grqf6v6jl3dp4t6c9t9rk99cd8m2splc",
+                    "kava1ys70jvnajkv88529ys6urjcyle3k2j9r24g6a7",
+                    f'send {i} kava, "memo"' if i % 5 == 0 else "",
+                )
+            )
+        return caajs
+
+    def test_spill_matches_in_memory_sort(self):
+        caajs = TestJournalSorter.get_caajs(500)
+
+        with JournalSorter() as sorter:
+            sorter.extend(caajs)
+            in_memory = io.StringIO()
+            sorter.write_csv(in_memory)
+            self.assertEqual(sorter.runs, [])
+
+        with JournalSorter(max_memory=4096) as sorter:
+            sorter.extend(caajs)
+            self.assertGreater(len(sorter.runs), 1)
+            spilled = io.StringIO()
+            sorter.write_csv(spilled)
+            runs = list(sorter.runs)
+        for run in runs:
+            self.assertFalse(os.path.exists(run))
+
+        self.assertEqual(in_memory.getvalue(), spilled.getvalue())
+
+    def test_matches_pandas_csv(self):
+        caajs = TestJournalSorter.get_caajs(200)
+        df = pd.DataFrame(caajs)
+        df = df.sort_values("executed_at", kind="stable")
+
+        with JournalSorter(max_memory=2048) as sorter:
+            sorter.extend(caajs)
+            spilled = io.StringIO()
+            sorter.write_csv(spilled)
+
+        self.assertEqual(df.to_csv(None, index=False), spilled.getvalue())
+
+    def test_get_caajs_by_several_keys(self):
+        caajs = TestJournalSorter.get_caajs(300)
+        expected = sorted(
+            caajs, key=lambda caaj: (caaj.executed_at, caaj.transaction_id)
+        )
+
+        for max_memory in [None, 4096]:
+            with JournalSorter(max_memory, ("executed_at", "transaction_id")) as sorter:
+                sorter.extend(caajs)
+                self.assertEqual(list(sorter.get_caajs()), expected)
+
+    def test_invalid_max_memory(self):
+        with self.assertRaises(ValueError):
+            JournalSorter(max_memory=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
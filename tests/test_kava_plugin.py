@@ -1,11 +1,13 @@
 import json
+import types
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from unittest.mock import MagicMock
 
 from senkalib.platform.kava.kava_transaction import KavaTransaction
 
-from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.kava_plugin import KavaPlugin, UnknownActionError
 
 
 class TestKavaPlugin(unittest.TestCase):
@@ -1162,6 +1164,93 @@ class TestKavaPlugin(unittest.TestCase):
         assert caaj_transaction_fee.caaj_to == "fee"
         assert caaj_transaction_fee.comment == ""
 
+    def test_get_caajs_for_addresses(self):
+        test_data = TestKavaPlugin._get_test_data("send_v8")
+        transaction = KavaTransaction(test_data)
+        mock = TestKavaPlugin.get_token_table_mock()
+        sender = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+        recipient = "kava1ys70jvnajkv88529ys6urjcyle3k2j9r24g6a7"
+        caajs = KavaPlugin.get_caajs_for_addresses(
+            [recipient, "kava1jv65s3grqf6v6jl3dp4t6c9t9rk99cd8m2splc", sender],
+            transaction,
+            mock,
+        )
+
+        assert list(caajs.keys()) == [recipient, sender]
+        assert caajs[recipient][0].type == "receive"
+        assert caajs[sender][0].type == "send"
+        for address in [recipient, sender]:
+            expected = KavaPlugin.get_caajs(address, transaction, mock)
+            assert len(caajs[address]) == len(expected)
+            for caaj, expected_caaj in zip(caajs[address], expected):
+                assert caaj.type == expected_caaj.type
+                assert caaj.amount == expected_caaj.amount
+                assert caaj.caaj_from == expected_caaj.caaj_from
+                assert caaj.caaj_to == expected_caaj.caaj_to
+
+        caajs = KavaPlugin.get_caajs_for_addresses(
+            ["kava1jv65s3grqf6v6jl3dp4t6c9t9rk99cd8m2splc"], transaction, mock
+        )
+        assert caajs == {}
+
+    def test_iter_caajs(self):
+        test_data = TestKavaPlugin._get_test_data("claim_hard_reward_v7")
+        transaction = KavaTransaction(test_data)
+        mock = TestKavaPlugin.get_token_table_mock()
+        address = "kava1cj7njkw2g9fqx4e768zc75dp9sks8u9znxrf0w"
+
+        caajs = KavaPlugin.iter_caajs(address, transaction, mock)
+        assert isinstance(caajs, types.GeneratorType)
+        expected = KavaPlugin.get_caajs(address, transaction, mock)
+        assert [(caaj.type, caaj.amount, caaj.uti) for caaj in caajs] == [
+            (caaj.type, caaj.amount, caaj.uti) for caaj in expected
+        ]
+
+    def test_get_caajs_many(self):
+        mock = TestKavaPlugin.get_token_table_mock()
+        sender = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+        unknown_action = TestKavaPlugin._get_test_data("send_v8")
+        for event in unknown_action["data"]["logs"][0]["events"]:
+            for attribute in event["attributes"]:
+                if attribute["key"] == "action":
+                    attribute["value"] = "unknown_action"
+        other_chain = TestKavaPlugin._get_test_data("send_v8")
+        other_chain["header"]["chain_id"] = "cosmoshub-4"
+        transactions = [
+            KavaTransaction(TestKavaPlugin._get_test_data("send_v8")),
+            KavaTransaction(unknown_action),
+            KavaTransaction(other_chain),
+            KavaTransaction(TestKavaPlugin._get_test_data("delegate_v8")),
+        ]
+        expected = KavaPlugin.get_caajs(sender, transactions[0], mock)
+        expected += KavaPlugin.get_caajs(sender, transactions[3], mock)
+
+        caajs = KavaPlugin.get_caajs_many(sender, transactions, mock)
+        assert next(caajs).type == expected[0].type
+        with self.assertRaises(UnknownActionError):
+            list(caajs)
+
+        for executor in [None, ThreadPoolExecutor(max_workers=2)]:
+            errors = []
+            caajs = list(
+                KavaPlugin.get_caajs_many(
+                    sender,
+                    transactions,
+                    mock,
+                    executor=executor,
+                    chunk_size=1,
+                    on_error=lambda transaction, e: errors.append((transaction, e)),
+                )
+            )
+            assert [(caaj.type, caaj.amount, caaj.uti) for caaj in caajs] == [
+                (caaj.type, caaj.amount, caaj.uti) for caaj in expected
+            ]
+            assert len(errors) == 1
+            assert errors[0][0] is transactions[1]
+            assert isinstance(errors[0][1], UnknownActionError)
+            if executor is not None:
+                executor.shutdown()
+
     @classmethod
     def _get_test_data(cls, filename):
         with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
@@ -0,0 +1,72 @@
+import random
+import sys
+import unittest
+
+from kava_plugin.kava_util import KavaUtil
+
+
+class TestKavaUtil(unittest.TestCase):
+    def test_shift_uamount(self):
+        values = ["0", "000", "1", "10", "100000", "1000000", "1234500", "0001234567"]
+        generator = random.Random(0)
+        values += [str(generator.randrange(10**30)) for _ in range(1000)]
+        for value in values:
+            self.assertEqual(
+                KavaUtil.shift_uamount(value),
+                str(KavaUtil.convert_uamount_amount(value)),
+            )
+
+    def test_intern_strings(self):
+        def copy(value):
+            return "".join(list(value))
+
+        address = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+        payload = KavaUtil.intern_strings(
+            {
+                copy("type"): copy("message"),
+                "attributes": [
+                    {"key": copy("action"), "value": copy("delegate")},
+                    {"key": "sender", "value": copy(address)},
+                    {"key": "amount", "value": copy("1234ukava")},
+                ],
+                "height": copy("1234567"),
+                "denom": copy("ukava"),
+                "fee": [1, None],
+            }
+        )
+        key = list(payload)[0]
+        self.assertIs(key, sys.intern("type"))
+        self.assertIs(payload[key], sys.intern("message"))
+        attributes = payload["attributes"]
+        self.assertIs(attributes[0]["key"], sys.intern("action"))
+        self.assertIs(attributes[0]["value"], sys.intern("delegate"))
+        self.assertIs(attributes[1]["value"], sys.intern(address))
+        self.assertIs(payload["denom"], sys.intern("ukava"))
+        # unique values are not interned
+        self.assertIsNot(attributes[2]["value"], sys.intern(copy("1234ukava")))
+        self.assertIsNot(payload["height"], sys.intern(copy("1234567")))
+        self.assertEqual(payload["fee"], [1, None])
+
+    def test_get_rewards(self):
+        coins = "1234567ukava,5hard,100000000xrpb,42,7000000swp:usdx"
+        event = {"attributes": [{"key": "amount", "value": coins}]}
+        expected = []
+        for coin in coins.split(","):
+            amount, token = KavaUtil.split_amount(coin)
+            expected.append(
+                {
+                    "reward_token": token,
+                    "reward_amount": str(KavaUtil.convert_uamount_amount(amount)),
+                }
+            )
+
+        self.assertEqual(KavaUtil.get_rewards(event), expected)
+        self.assertEqual(
+            [reward["reward_token"] for reward in expected],
+            ["kava", "hard", "xrp", "kava", "swp:usdx"],
+        )
+        self.assertEqual(KavaUtil.get_rewards(None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
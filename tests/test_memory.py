@@ -0,0 +1,114 @@
+import contextlib
+import importlib
+import json
+import os
+import tracemalloc
+import unittest
+from typing import Iterator
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+import main
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.period_rollup import PeriodRollup
+from kava_plugin.synthetic_history import SyntheticHistory
+
+ADDRESS = "kava1cj7njkw2g9fqx4e768zc75dp9sks8u9znxrf0w"
+TRANSACTIONS = 10000
+
+# budgets per 10k synthetic transactions, about twice the measured usage
+STREAM_PEAK_BUDGET = 1024**2
+RETAINED_JOURNAL_BUDGET = 1024
+SPILL_PEAK_BUDGET = 4 * 1024**2
+DATAFRAME_JOURNAL_BUDGET = 3 * 1024
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str) -> str:
+        return f"{token_original_id}/{platform}"
+
+
+class TestMemory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # generated once and kept as json outside of the traced allocations
+        history = SyntheticHistory.from_directory("tests/data", address=ADDRESS)
+        cls.payloads = [
+            json.dumps(payload) for payload in history.get_payloads(TRANSACTIONS)
+        ]
+
+    def setUp(self):
+        tracemalloc.start()
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_streaming_peak(self):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        journals = 0
+        for _ in KavaPlugin.get_caajs_many(
+            ADDRESS, self._get_transactions(), TokenTable()
+        ):
+            journals += 1
+        peak = tracemalloc.get_traced_memory()[1] - before
+
+        self.assertGreater(journals, TRANSACTIONS)
+        self.assertLess(peak, STREAM_PEAK_BUDGET)
+
+    def test_rollup_peak(self):
+        # journals are summed as they are produced and never kept
+        rollup = PeriodRollup("day")
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        rollup.extend(
+            KavaPlugin.get_caajs_many(ADDRESS, self._get_transactions(), TokenTable())
+        )
+        peak = tracemalloc.get_traced_memory()[1] - before
+
+        self.assertGreater(sum(rollup.counts.values()), TRANSACTIONS)
+        self.assertLess(peak, STREAM_PEAK_BUDGET)
+
+    def test_retained_journal_size(self):
+        before = tracemalloc.get_traced_memory()[0]
+        caajs = list(
+            KavaPlugin.get_caajs_many(ADDRESS, self._get_transactions(), TokenTable())
+        )
+        retained = tracemalloc.get_traced_memory()[0] - before
+
+        self.assertLess(retained / len(caajs), RETAINED_JOURNAL_BUDGET)
+
+    def test_spilled_output_peak(self):
+        peak = self._get_write_caajs_peak(1024**2)
+        self.assertLess(peak, SPILL_PEAK_BUDGET)
+
+    def test_dataframe_output_peak(self):
+        # the first import of pandas is not part of the output path
+        importlib.import_module("pandas")
+        journals = sum(
+            1
+            for _ in KavaPlugin.get_caajs_many(
+                ADDRESS, self._get_transactions(), TokenTable()
+            )
+        )
+        peak = self._get_write_caajs_peak(None)
+        self.assertLess(peak / journals, DATAFRAME_JOURNAL_BUDGET)
+
+    def _get_transactions(self) -> Iterator[KavaTransaction]:
+        for payload in self.payloads:
+            yield KavaTransaction(json.loads(payload))
+
+    def _get_write_caajs_peak(self, max_memory) -> int:
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                caajs = main.get_caajs(
+                    [ADDRESS], self._get_transactions(), TokenTable()
+                )
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                main.write_caajs(caajs, max_memory)
+                return tracemalloc.get_traced_memory()[1] - before
+
+
+if __name__ == "__main__":
+    unittest.main()
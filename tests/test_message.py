@@ -1,9 +1,16 @@
 import json
 import unittest
+from unittest.mock import patch
 
 from senkalib.platform.kava.kava_transaction import KavaTransaction
 
-from kava_plugin.message_factory import MessageFactory
+from kava_plugin.message import Message
+from kava_plugin.message_factory import (
+    KAVA_9_EXTRACTOR,
+    LEGACY_EXTRACTOR,
+    MessageFactory,
+)
+from kava_plugin.metrics import MESSAGES
 
 
 class TestMessage(unittest.TestCase):
@@ -323,6 +330,75 @@ class TestMessage(unittest.TestCase):
             },
         )
 
+    def test_extractor_selected_once_per_chain_id(self):
+        MessageFactory._extractors.clear()
+        with patch.object(
+            KavaTransaction,
+            "get_platform_version",
+            autospec=True,
+            side_effect=KavaTransaction.get_platform_version,
+        ) as get_platform_version:
+            for filename in [
+                "send_v8",
+                "delegate_v8",
+                "send_v2",
+                "createAtomicSwap_v9",
+            ]:
+                TestMessage._get_test_data_messages_result(filename)
+
+        self.assertEqual(get_platform_version.call_count, 3)
+        self.assertIs(MessageFactory._extractors["kava-2"], LEGACY_EXTRACTOR)
+        self.assertIs(MessageFactory._extractors["kava-8"], LEGACY_EXTRACTOR)
+        self.assertIs(MessageFactory._extractors["kava-9"], KAVA_9_EXTRACTOR)
+
+    def test_actions_are_version_specific(self):
+        legacy_events = [
+            {"type": "message", "attributes": [{"key": "action", "value": "send"}]}
+        ]
+        type_url_events = [
+            {
+                "type": "message",
+                "attributes": [
+                    {"key": "action", "value": "/cosmos.bank.v1beta1.MsgSend"},
+                    {"key": "sender", "value": "kava1sender"},
+                ],
+            }
+        ]
+
+        self.assertEqual(
+            Message(legacy_events, {}, "1", "kava-9").get_result()["action"], None
+        )
+        self.assertEqual(
+            Message(type_url_events, {}, "1", "kava-4").get_result()["action"], None
+        )
+        self.assertEqual(
+            Message(type_url_events, {}, "1", "kava-9").get_result()["action"], "send"
+        )
+
+    def test_message_view_skips_messages_without_journals(self):
+        with open("tests/data/vote_v8.json", encoding="utf-8") as jsonfile_local:
+            vote = KavaTransaction(json.load(jsonfile_local))
+        with open("tests/data/send_v8.json", encoding="utf-8") as jsonfile_local:
+            send = KavaTransaction(json.load(jsonfile_local))
+
+        view = MessageFactory.get_message_views(vote)[0]
+        before = MESSAGES.get("vote", "kava-8")
+        with patch.object(
+            view.extractor, "get_messages_events", side_effect=AssertionError
+        ), patch.object(
+            Message, "read_action", wraps=Message.read_action
+        ) as read_action:
+            self.assertEqual(view.get_action(), "vote")
+            self.assertEqual(view.get_result(), {"action": "vote", "result": None})
+        self.assertEqual(read_action.call_count, 1)
+        self.assertEqual(MESSAGES.get("vote", "kava-8") - before, 1)
+
+        view = MessageFactory.get_message_views(send)[0]
+        self.assertEqual(view.get_normalized_action(), "send")
+        self.assertEqual(
+            view.get_result(), MessageFactory.get_messages(send)[0].get_result()
+        )
+
     @classmethod
     def _get_test_data_messages_result(cls, filename) -> dict:
         with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
@@ -0,0 +1,69 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.message_cache import MessageCache
+from kava_plugin.message_factory import MessageFactory
+
+
+class TestMessageCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = MessageCache(max_size=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        self.assertEqual(cache.get("a"), [1])
+        cache.put("c", [3])
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [1])
+        self.assertEqual(cache.get("c"), [3])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_stats(self):
+        cache = MessageCache(max_size=2)
+        self.assertEqual(cache.get_hit_rate(), 0.0)
+        cache.put("a", [])
+        cache.get("a")
+        cache.get("b")
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["size"], 1)
+
+    def test_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            MessageCache(max_size=0)
+
+    def test_shared_results_across_addresses(self):
+        transaction = KavaTransaction(TestMessageCache._get_test_data("send_v8"))
+        mock = MagicMock()
+        mock.get_uti.side_effect = lambda platform, token: f"{token}/{platform}"
+        cache = MessageCache()
+        sender = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+        recipient = "kava1ys70jvnajkv88529ys6urjcyle3k2j9r24g6a7"
+
+        with patch.object(
+            MessageFactory, "get_message_views", wraps=MessageFactory.get_message_views
+        ) as get_message_views:
+            sender_caajs = KavaPlugin.get_caajs(sender, transaction, mock, cache)
+            recipient_caajs = KavaPlugin.get_caajs(recipient, transaction, mock, cache)
+
+        self.assertEqual(get_message_views.call_count, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(sender_caajs[0].type, "send")
+        self.assertEqual(recipient_caajs[0].type, "receive")
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.metrics import (
+    CONVERSION_SECONDS,
+    JOURNALS,
+    MESSAGES,
+    TRANSACTIONS,
+    UNKNOWN_ACTIONS,
+    UTI_MISSES,
+    Metric,
+    MetricsRegistry,
+)
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str):
+        return (
+            None if token_original_id == "hard" else f"{token_original_id}/{platform}"
+        )
+
+
+class TestMetrics(unittest.TestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter.", ["action"])
+        histogram = registry.histogram(
+            "test_seconds", "Test histogram.", ["action"], buckets=[0.1, 1.0]
+        )
+        counter.inc("send")
+        counter.inc("send", amount=2)
+        counter.inc('say "hi"')
+        histogram.observe(0.05, "send")
+        histogram.observe(0.5, "send")
+
+        self.assertEqual(
+            registry.render(),
+            "\n".join(
+                [
+                    "# HELP test_total Test counter.",
+                    "# TYPE test_total counter",
+                    'test_total{action="say \\"hi\\""} 1',
+                    'test_total{action="send"} 3',
+                    "# HELP test_seconds Test histogram.",
+                    "# TYPE test_seconds histogram",
+                    'test_seconds_bucket{action="send",le="0.1"} 1',
+                    'test_seconds_bucket{action="send",le="1.0"} 2',
+                    'test_seconds_bucket{action="send",le="+Inf"} 2',
+                    'test_seconds_sum{action="send"} 0.55',
+                    'test_seconds_count{action="send"} 2',
+                ]
+            )
+            + "\n",
+        )
+
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            registry.counter("test_total", "Duplicated counter.")
+
+    def test_snapshot_and_merge(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter.")
+        histogram = registry.histogram("test_seconds", "Test histogram.")
+        counter.inc()
+        histogram.observe(0.01)
+        snapshot = registry.snapshot()
+
+        registry.merge(snapshot)
+        self.assertEqual(counter.get(), 2)
+        self.assertEqual(histogram.get_count(), 2)
+
+        registry.reset()
+        self.assertEqual(counter.get(), 0)
+        self.assertEqual(histogram.get_count(), 0)
+
+    def test_write_and_serve(self):
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test counter.").inc()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kava_plugin.prom")
+            registry.write(path)
+            with open(path, encoding="utf-8") as metrics_file:
+                self.assertEqual(metrics_file.read(), registry.render())
+            self.assertEqual(os.listdir(directory), ["kava_plugin.prom"])
+
+        server = registry.serve(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                self.assertEqual(response.read().decode(), registry.render())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_incomplete_metric(self):
+        class Gauge(Metric):
+            type = "gauge"
+
+            def get_samples(self):
+                return iter([])
+
+        with self.assertRaises(TypeError):
+            Gauge("test_gauge", "Test gauge.")
+
+    def test_worker_process_metrics(self):
+        transaction = KavaTransaction(
+            TestMetrics._get_test_data("claim_hard_reward_v7")
+        )
+        before = {
+            "transactions": TRANSACTIONS.get("kava-7"),
+            "messages": MESSAGES.get("claim_hard_reward", "kava-7"),
+            "uti_misses": UTI_MISSES.get("hard"),
+        }
+
+        with ProcessPoolExecutor(
+            max_workers=2, initializer=KavaPlugin.init_worker, initargs=(TokenTable(),)
+        ) as executor:
+            caajs = list(
+                KavaPlugin.get_caajs_many(
+                    "kava1af7lm2qv9zp526gjd3cdxrpr9zeangjlyhjqjx",
+                    [transaction] * 3,
+                    TokenTable(),
+                    executor=executor,
+                    chunk_size=1,
+                    worker_processes=True,
+                )
+            )
+
+        self.assertGreater(len(caajs), 0)
+        self.assertEqual(TRANSACTIONS.get("kava-7") - before["transactions"], 3)
+        self.assertEqual(
+            MESSAGES.get("claim_hard_reward", "kava-7") - before["messages"], 3
+        )
+        self.assertGreater(UTI_MISSES.get("hard") - before["uti_misses"], 0)
+
+        with self.assertRaises(ValueError):
+            list(
+                KavaPlugin.get_caajs_many(
+                    "kava1af7lm2qv9zp526gjd3cdxrpr9zeangjlyhjqjx",
+                    [transaction],
+                    TokenTable(),
+                    worker_processes=True,
+                )
+            )
+
+    def test_pipeline_metrics(self):
+        token_table = MagicMock()
+        token_table.get_uti.side_effect = (
+            lambda platform, token: None if token == "hard" else f"{token}/{platform}"
+        )
+        before = {
+            "transactions": TRANSACTIONS.get("kava-7"),
+            "messages": MESSAGES.get("claim_hard_reward", "kava-7"),
+            "journals": JOURNALS.get("kava-7"),
+            "latency": CONVERSION_SECONDS.get_count("kava-7"),
+            "uti_misses": UTI_MISSES.get("hard"),
+            "unknown": UNKNOWN_ACTIONS.get("unknown_action", "kava-7"),
+        }
+
+        caajs = KavaPlugin.get_caajs(
+            "kava1af7lm2qv9zp526gjd3cdxrpr9zeangjlyhjqjx",
+            KavaTransaction(TestMetrics._get_test_data("claim_hard_reward_v7")),
+            token_table,
+        )
+
+        self.assertEqual(TRANSACTIONS.get("kava-7") - before["transactions"], 1)
+        self.assertEqual(
+            MESSAGES.get("claim_hard_reward", "kava-7") - before["messages"], 1
+        )
+        self.assertEqual(JOURNALS.get("kava-7") - before["journals"], len(caajs))
+        self.assertEqual(CONVERSION_SECONDS.get_count("kava-7") - before["latency"], 1)
+        self.assertGreater(UTI_MISSES.get("hard") - before["uti_misses"], 0)
+
+        payload = TestMetrics._get_test_data("claim_hard_reward_v7")
+        for event in payload["data"]["logs"][0]["events"]:
+            if event["type"] == "message":
+                for attribute in event["attributes"]:
+                    if attribute["key"] == "action":
+                        attribute["value"] = "unknown_action"
+        with self.assertRaises(Exception):
+            KavaPlugin.get_caajs(
+                "kava1af7lm2qv9zp526gjd3cdxrpr9zeangjlyhjqjx",
+                KavaTransaction(payload),
+                token_table,
+            )
+        self.assertEqual(
+            UNKNOWN_ACTIONS.get("unknown_action", "kava-7") - before["unknown"], 1
+        )
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import glob
+import io
+import json
+import unittest
+from decimal import Decimal
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.period_rollup import PeriodRollup
+
+ADDRESS = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str) -> str:
+        return f"{token_original_id}/{platform}"
+
+
+class TestPeriodRollup(unittest.TestCase):
+    @classmethod
+    def get_caajs(cls) -> list:
+        transactions = []
+        for path in sorted(glob.glob("tests/data/*.json")):
+            with open(path, encoding="utf-8") as jsonfile_local:
+                transactions.append(KavaTransaction(json.load(jsonfile_local)))
+        return list(KavaPlugin.get_caajs_many(ADDRESS, transactions, TokenTable()))
+
+    def test_rollup(self):
+        caajs = TestPeriodRollup.get_caajs()
+        rollup = PeriodRollup("month")
+        self.assertEqual(list(rollup.track(caajs)), caajs)
+
+        expected: dict = {}
+        for caaj in caajs:
+            key = (caaj.executed_at[:7], caaj.uti, caaj.type)
+            amount, count = expected.get(key, (Decimal(0), 0))
+            expected[key] = (amount + Decimal(caaj.amount), count + 1)
+        rows = rollup.get_rows()
+        self.assertEqual(
+            {tuple(row[:3]): (Decimal(row[3]), row[4]) for row in rows}, expected
+        )
+        self.assertEqual(sum(row[4] for row in rows), len(caajs))
+        self.assertEqual(rows, sorted(rows, key=lambda row: tuple(map(str, row))))
+
+        stream = io.StringIO()
+        rollup.write_csv(stream)
+        self.assertEqual(
+            stream.getvalue().splitlines()[0], "period,uti,type,amount,journals"
+        )
+
+    def test_group_by(self):
+        rollup = PeriodRollup("quarter", ["service", "type"])
+        rollup.extend(TestPeriodRollup.get_caajs())
+        self.assertEqual(
+            rollup.get_field_names(),
+            ["period", "service", "type", "amount", "journals"],
+        )
+        self.assertIn(["2021-Q2", "cdp borrow", "borrow", "3500", 1], rollup.get_rows())
+
+        for period, group_by in [
+            ("week", ["uti", "type"]),
+            ("day", ["amount", "type"]),
+            ("month", ["uti"]),
+        ]:
+            with self.assertRaises(ValueError):
+                PeriodRollup(period, group_by)
+
+    def test_get_period(self):
+        executed_at = "2022-11-05 12:34:56"
+        self.assertEqual(
+            [
+                PeriodRollup.get_period(executed_at, period)
+                for period in ["day", "month", "quarter", "year"]
+            ],
+            ["2022-11-05", "2022-11", "2022-Q4", "2022"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from senkalib.caaj_journal import CaajJournal
+
+from kava_plugin.position_tracker import Position, PositionTracker
+
+ADDRESS = "kava1dlezgt8undlpvdp0esmzyvxzvc59gkd56vkmea"
+OTHER = "kava1ys70jvnajkv88529ys6urjcyle3k2j9r24g6a7"
+
+
+def get_caaj(executed_at, transaction_id, caaj_type, amount, uti, caaj_from, caaj_to):
+    return CaajJournal(
+        executed_at,
+        "kava",
+        "kava",
+        "test",
+        transaction_id,
+        "trade",
+        caaj_type,
+        amount,
+        uti,
+        caaj_from,
+        caaj_to,
+        "",
+    )
+
+
+FIRST_RUN = [
+    get_caaj(
+        "2022-01-01 00:00:00", "A", "deposit", "10", "bnb/kava", ADDRESS, "kava_cdp"
+    ),
+    get_caaj(
+        "2022-01-01 00:00:00", "A", "borrow", "500", "usdx/kava", "kava_cdp", ADDRESS
+    ),
+    get_caaj(
+        "2022-01-02 00:00:00",
+        "B",
+        "deposit",
+        "200",
+        "usdx/kava",
+        ADDRESS,
+        "hard_lending",
+    ),
+    get_caaj("2022-01-02 00:00:00", "B", "lose", "0.001", "kava/kava", ADDRESS, "fee"),
+    get_caaj(
+        "2022-01-03 00:00:00",
+        "C",
+        "get_bonds",
+        "7",
+        "bnb:usdx/kava",
+        "kava_swap",
+        OTHER,
+    ),
+    get_caaj(
+        "2022-01-03 00:00:00", "C", "deposit", "3", "bnb/kava", OTHER, "kava_swap"
+    ),
+]
+SECOND_RUN = [
+    # the history is fetched again from a point before the saved state
+    get_caaj(
+        "2022-01-02 00:00:00",
+        "B",
+        "deposit",
+        "200",
+        "usdx/kava",
+        ADDRESS,
+        "hard_lending",
+    ),
+    get_caaj(
+        "2022-01-03 00:00:00",
+        "C",
+        "get_bonds",
+        "7",
+        "bnb:usdx/kava",
+        "kava_swap",
+        OTHER,
+    ),
+    get_caaj(
+        "2022-01-03 00:00:00", "D", "repay", "500", "usdx/kava", ADDRESS, "kava_cdp"
+    ),
+    get_caaj(
+        "2022-01-04 00:00:00", "E", "borrow", "50", "busd/kava", "hard_lending", ADDRESS
+    ),
+]
+
+
+class TestPositionTracker(unittest.TestCase):
+    def test_positions(self):
+        tracker = PositionTracker()
+        self.assertEqual(list(tracker.track(FIRST_RUN)), FIRST_RUN)
+        self.assertEqual(
+            tracker.get_positions(),
+            [
+                Position(ADDRESS, "cdp_collateral", "bnb/kava", "10"),
+                Position(ADDRESS, "cdp_debt", "usdx/kava", "500"),
+                Position(ADDRESS, "hard_supplied", "usdx/kava", "200"),
+                Position(OTHER, "pool_shares", "bnb:usdx/kava", "7"),
+            ],
+        )
+        self.assertEqual(
+            tracker.get_positions([OTHER]),
+            [Position(OTHER, "pool_shares", "bnb:usdx/kava", "7")],
+        )
+
+        stream = io.StringIO()
+        tracker.write_csv(stream, [OTHER])
+        self.assertEqual(
+            stream.getvalue().splitlines(),
+            ["address,position,uti,amount", f"{OTHER},pool_shares,bnb:usdx/kava,7"],
+        )
+
+    def test_incremental_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "positions.json")
+            tracker = PositionTracker.load(path)
+            list(tracker.track(FIRST_RUN))
+            tracker.save(path)
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.assertEqual(
+                state["transaction_ids"], {ADDRESS: ["A", "B"], OTHER: ["C"]}
+            )
+
+            tracker = PositionTracker.load(path)
+            list(tracker.track(SECOND_RUN))
+            tracker.save(path)
+            tracker = PositionTracker.load(path)
+
+            self.assertEqual(
+                tracker.get_positions(),
+                [
+                    Position(ADDRESS, "cdp_collateral", "bnb/kava", "10"),
+                    Position(ADDRESS, "hard_borrowed", "busd/kava", "50"),
+                    Position(ADDRESS, "hard_supplied", "usdx/kava", "200"),
+                    Position(OTHER, "pool_shares", "bnb:usdx/kava", "7"),
+                ],
+            )
+            self.assertEqual(os.listdir(directory), ["positions.json"])
+
+    def test_new_address(self):
+        # an address added to an existing state gets its whole history,
+        # even when it is older than the transactions already in the state
+        tracker = PositionTracker()
+        list(tracker.track(FIRST_RUN[4:]))
+        list(tracker.track(FIRST_RUN[:4]))
+        self.assertEqual(
+            tracker.get_positions([ADDRESS]),
+            [
+                Position(ADDRESS, "cdp_collateral", "bnb/kava", "10"),
+                Position(ADDRESS, "cdp_debt", "usdx/kava", "500"),
+                Position(ADDRESS, "hard_supplied", "usdx/kava", "200"),
+            ],
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "positions.json")
+            tracker = PositionTracker()
+            list(tracker.track(FIRST_RUN[4:]))
+            tracker.save(path)
+            tracker = PositionTracker.load(path)
+            list(tracker.track(FIRST_RUN))
+            expected = PositionTracker()
+            list(expected.track(FIRST_RUN))
+            self.assertEqual(tracker.get_positions(), expected.get_positions())
+
+    def test_replayed_transactions(self):
+        # a replayed dead letter is older than the transactions of the state
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "positions.json")
+            tracker = PositionTracker()
+            list(tracker.track([*FIRST_RUN[:2], *FIRST_RUN[4:]]))
+            tracker.save(path)
+            tracker = PositionTracker.load(path)
+            list(tracker.track(FIRST_RUN[2:4]))
+            self.assertIn(
+                Position(ADDRESS, "hard_supplied", "usdx/kava", "200"),
+                tracker.get_positions(),
+            )
+            self.assertEqual(len(tracker.get_positions()), 4)
+
+    def test_filtered_run(self):
+        # a run with --actions fees only sees the fee journals of the transactions
+        fees = [caaj for caaj in FIRST_RUN if caaj.caaj_to == "fee"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "positions.json")
+            tracker = PositionTracker()
+            list(tracker.track(fees))
+            tracker.save(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["transaction_ids"], {})
+
+            tracker = PositionTracker.load(path)
+            list(tracker.track(FIRST_RUN))
+            expected = PositionTracker()
+            list(expected.track(FIRST_RUN))
+            self.assertEqual(tracker.get_positions(), expected.get_positions())
+
+    def test_unsupported_state(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "positions.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"version": 0}, f)
+            with self.assertRaises(ValueError):
+                PositionTracker.load(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
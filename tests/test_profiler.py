@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from kava_plugin.profiler import SamplingProfiler
+
+
+def busy_loop(seconds: float) -> int:
+    count = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapsed(self):
+        with SamplingProfiler(interval=0.001) as profiler:
+            busy_loop(0.2)
+
+        collapsed = profiler.get_collapsed()
+        self.assertIn(f"{__name__}:busy_loop", collapsed)
+        for line in collapsed.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+            self.assertNotIn("kava_plugin_profiler", stack)
+
+    def test_speedscope(self):
+        with SamplingProfiler(interval=0.001) as profiler:
+            busy_loop(0.1)
+
+        speedscope = profiler.get_speedscope()
+        frames = speedscope["shared"]["frames"]
+        profile = speedscope["profiles"][0]
+        self.assertEqual(profile["type"], "sampled")
+        self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+        self.assertAlmostEqual(profile["endValue"], sum(profile["weights"]))
+        names = {
+            frames[index]["name"] for sample in profile["samples"] for index in sample
+        }
+        self.assertIn(f"{__name__}:busy_loop", names)
+
+    def test_write(self):
+        with SamplingProfiler(interval=0.001) as profiler:
+            busy_loop(0.05)
+
+        with tempfile.TemporaryDirectory() as directory:
+            collapsed_path = os.path.join(directory, "profile.txt")
+            speedscope_path = os.path.join(directory, "profile.json")
+            profiler.write(collapsed_path)
+            profiler.write(speedscope_path)
+
+            with open(collapsed_path, encoding="utf-8") as collapsed_file:
+                self.assertEqual(collapsed_file.read(), profiler.get_collapsed())
+            with open(speedscope_path, encoding="utf-8") as speedscope_file:
+                self.assertEqual(json.load(speedscope_file), profiler.get_speedscope())
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            SamplingProfiler(interval=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# modules that main.py must only import on the code paths that need them
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "requests",
+    "http.server",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "senkalib.platform.kava.kava_transaction_generator",
+    "senkalib.token_original_id_table",
+]
+
+
+def get_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in ["src", env.get("PYTHONPATH")] if path
+    )
+    return env
+
+
+def get_import_times(code: str) -> dict:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=get_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+class TestStartup(unittest.TestCase):
+    def test_main_imports_heavy_modules_lazily(self):
+        # modules senkalib itself imports can not be avoided by main.py
+        baseline = get_import_times(
+            "import senkalib.caaj_journal, senkalib.platform.kava.kava_transaction"
+        )
+        import_times = get_import_times("import main")
+
+        self.assertIn("main", import_times)
+        for module in HEAVY_MODULES:
+            if module not in baseline:
+                self.assertNotIn(module, import_times)
+
+    def test_decimal_context_is_not_changed_on_import(self):
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import decimal, main; print(decimal.getcontext().prec)",
+            ],
+            env=get_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        baseline = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import decimal, senkalib.platform.kava.kava_transaction; print(decimal.getcontext().prec)",
+            ],
+            env=get_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(process.stdout, baseline.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import unittest
+
+from kava_plugin.height_shard import HeightShard
+from kava_plugin.kava_plugin import KavaPlugin
+from kava_plugin.message_factory import MessageFactory
+from kava_plugin.synthetic_history import SyntheticHistory
+
+ADDRESS = "kava1af7lm2qv9zp526gjd3cdxrpr9zeangjlyhjqjx"
+
+
+class TokenTable:
+    def get_uti(self, platform: str, token_original_id: str) -> str:
+        return f"{token_original_id}/{platform}"
+
+
+class TestSyntheticHistory(unittest.TestCase):
+    def test_transactions_are_valid(self):
+        history = SyntheticHistory.from_directory(
+            "tests/data", address=ADDRESS, max_messages=3
+        )
+        transactions = list(history.get_transactions(2000))
+
+        keys = [HeightShard.get_key(transaction) for transaction in transactions]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(
+            {key[0] for key in keys},
+            {template.version for template in history.templates},
+        )
+        self.assertEqual(
+            len({transaction.get_transaction_id() for transaction in transactions}),
+            len(transactions),
+        )
+
+        message_counts = set()
+        for transaction in transactions:
+            self.assertIn(ADDRESS, json.dumps(transaction.get_transaction()))
+            if transaction.get_fail() is False:
+                message_counts.add(len(MessageFactory.get_messages(transaction)))
+            KavaPlugin.get_caajs(ADDRESS, transaction, TokenTable())
+        self.assertEqual(message_counts, {1, 2, 3})
+
+    def test_amounts_and_addresses_vary(self):
+        history = SyntheticHistory.from_directory("tests/data")
+        template = next(t for t in history.templates if t.name == "send_v8")
+        amounts = set()
+        senders = set()
+        for _ in range(20):
+            payload = history._get_payload(template, 1, template.timestamp)
+            message = payload["data"]["tx"]["value"]["msg"][0]["value"]
+            amounts.add(message["amount"][0]["amount"])
+            senders.add(message["from_address"])
+        self.assertGreater(len(amounts), 1)
+        self.assertGreater(len(senders), 1)
+
+    def test_seed(self):
+        payloads = [
+            list(
+                SyntheticHistory.from_directory("tests/data", seed=seed).get_payloads(
+                    50
+                )
+            )
+            for seed in [1, 1, 2]
+        ]
+        self.assertEqual(payloads[0], payloads[1])
+        self.assertNotEqual(payloads[0], payloads[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from kava_plugin.transaction_reader import TransactionReader
+
+FIXTURES = ["delegate_v8", "send_v2", "createAtomicSwap_v9"]
+
+
+def _has_zstd() -> bool:
+    if shutil.which("zstd") is not None:
+        return True
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TestTransactionReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.lines = []
+        for filename in FIXTURES:
+            with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile:
+                self.lines.append(json.dumps(json.load(jsonfile)))
+        self.content = ("\n".join(self.lines) + "\n\n").encode()
+        self.expected = [json.loads(line)["data"]["txhash"] for line in self.lines]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_jsonl(self):
+        path = self._write("history.jsonl", self.content)
+        transactions = list(TransactionReader.read(path))
+        self.assertEqual(
+            [transaction.get_transaction_id() for transaction in transactions],
+            self.expected,
+        )
+
+    def test_shared_strings_are_interned(self):
+        path = self._write("history.jsonl", self.content)
+        first, second = list(TransactionReader.read_raw(path))[:2]
+        first_event, second_event = [
+            next(e for e in t["data"]["logs"][0]["events"] if e["type"] == "message")
+            for t in [first, second]
+        ]
+        self.assertEqual(first_event["type"], second_event["type"])
+        self.assertIs(first_event["type"], second_event["type"])
+        self.assertIs(list(first_event)[0], list(second_event)[0])
+
+    def test_read_gzip(self):
+        path = self._write("history.jsonl.gz", gzip.compress(self.content))
+        self.assertEqual(self._read_ids(path), self.expected)
+
+        with patch("kava_plugin.transaction_reader.shutil.which", return_value=None):
+            self.assertEqual(self._read_ids(path), self.expected)
+
+    @unittest.skipUnless(_has_zstd(), "zstd is not available")
+    def test_read_zstd(self):
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+
+        if zstandard is not None:
+            compressed = zstandard.ZstdCompressor().compress(self.content)
+            path = self._write("history.jsonl.zst", compressed)
+        else:
+            source = self._write("history.jsonl", self.content)
+            path = f"{source}.zst"
+            subprocess.run(["zstd", "-q", source, "-o", path], check=True)
+        self.assertEqual(self._read_ids(path), self.expected)
+
+        if zstandard is not None:
+            with patch(
+                "kava_plugin.transaction_reader.shutil.which", return_value=None
+            ):
+                self.assertEqual(self._read_ids(path), self.expected)
+
+    def test_read_many(self):
+        first = self._write("first.jsonl", self.content)
+        second = self._write("second.jsonl.gz", gzip.compress(self.content))
+        transactions = list(TransactionReader.read_many([first, second]))
+        self.assertEqual(len(transactions), len(self.expected) * 2)
+
+    def test_read_many_unique(self):
+        first = self._write("first.jsonl", self.content)
+        second = self._write("second.jsonl.gz", gzip.compress(self.content))
+        transactions = list(TransactionReader.read_many([first, second], unique=True))
+        self.assertEqual(
+            [transaction.get_transaction_id() for transaction in transactions],
+            self.expected,
+        )
+
+    def test_stop_early(self):
+        path = self._write("history.jsonl.gz", gzip.compress(self.content * 1000))
+        transactions = TransactionReader.read(path)
+        self.assertEqual(next(transactions).get_transaction_id(), self.expected[0])
+        transactions.close()
+
+    def test_broken_line(self):
+        path = self._write("history.jsonl", b'{"data": \n')
+        with self.assertRaises(ValueError):
+            list(TransactionReader.read_raw(path))
+
+    def _read_ids(self, path):
+        return [
+            transaction["data"]["txhash"]
+            for transaction in TransactionReader.read_raw(path)
+        ]
+
+    def _write(self, filename, content):
+        path = os.path.join(self.directory.name, filename)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+
+if __name__ == "__main__":
+    unittest.main()
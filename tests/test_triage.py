@@ -0,0 +1,82 @@
+import glob
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from senkalib.platform.kava.kava_transaction import KavaTransaction
+
+from kava_plugin.message_factory import MessageView
+from kava_plugin.triage import TriageReport
+
+
+class TestTriage(unittest.TestCase):
+    def test_triage(self):
+        transactions = [
+            KavaTransaction(TestTriage._get_test_data(path))
+            for path in sorted(glob.glob("tests/data/*.json"))
+        ]
+        unknown_action = TestTriage._get_test_data("tests/data/send_v8.json")
+        for event in unknown_action["data"]["logs"][0]["events"]:
+            for attribute in event["attributes"]:
+                if attribute["key"] == "action":
+                    attribute["value"] = "unknown_action"
+        missing_logs = TestTriage._get_test_data("tests/data/delegate_v8.json")
+        del missing_logs["data"]["logs"]
+        missing_action = TestTriage._get_test_data("tests/data/delegate_v8.json")
+        for event in missing_action["data"]["logs"][0]["events"]:
+            event["attributes"] = [
+                attribute
+                for attribute in event["attributes"]
+                if attribute["key"] != "action"
+            ]
+        other_chain = TestTriage._get_test_data("tests/data/send_v8.json")
+        other_chain["header"]["chain_id"] = "cosmoshub-4"
+        transactions += [
+            KavaTransaction(unknown_action),
+            KavaTransaction(missing_logs),
+            KavaTransaction(missing_action),
+            KavaTransaction(other_chain),
+        ]
+
+        with patch.object(MessageView, "get_message", side_effect=AssertionError):
+            report = TriageReport.triage(transactions)
+
+        self.assertEqual(report.transactions, len(transactions) - 1)
+        self.assertEqual(report.actions["kava-8", "delegate"], 4)
+        self.assertEqual(report.actions["kava-8", "failed"], 1)
+        self.assertEqual(report.actions["kava-8", "unknown"], 1)
+        self.assertEqual(report.actions["kava-8", "error"], 2)
+        self.assertEqual(report.actions["kava-9", "create_atomic_swap"], 1)
+        self.assertEqual(
+            [problem for _, problem in report.problems],
+            [
+                "failed",
+                "unknown action: unknown_action",
+                "KeyError: 'logs'",
+                "IndexError: list index out of range",
+            ],
+        )
+
+        stream = io.StringIO()
+        report.write(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "chain_id\taction\ttransactions")
+        self.assertIn("kava-8\tdelegate\t4", lines)
+        self.assertIn("failed transactions: 1", lines)
+        self.assertIn("unknown actions: 1", lines)
+        self.assertIn("other errors: 2", lines)
+        self.assertIn(
+            f"{unknown_action['data']['txhash']}\tunknown action: unknown_action",
+            lines,
+        )
+
+    @classmethod
+    def _get_test_data(cls, path):
+        with open(path, encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
+
+
+if __name__ == "__main__":
+    unittest.main()